@@ -0,0 +1,85 @@
+# Benchmark audit log: group commit (AuditLog) vs fsync per event.
+#
+# Jalankan dari folder backend:
+#   python -m benchmarks.bench_audit
+#   python -m benchmarks.bench_audit --events 5000 --concurrency 1 16 128
+#
+# Setiap "request" menunggu sampai event-nya ter-fsync. Dengan group
+# commit, request yang bersamaan berbagi satu fsync.
+import argparse, asyncio, json, os, shutil, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.auditlog import AuditLog
+
+EVENT = {
+    "event": "sign",
+    "ts": "2026-01-10T14:13:32.711198+07:00",
+    "verification_id": "0123456789abcdef",
+    "filename": "dokumen.pdf",
+    "document_hash": "q3Jx0m5m1n0Vb3lqO1j1mXcP2o8y3H1b8K0n0VJb2s0=",
+    "signer": "Benchmark"
+}
+
+
+async def run_group_commit(directory, events, concurrency):
+    log = AuditLog(directory)
+    log.start()
+    queue = iter(range(events))
+
+    async def worker():
+        for _ in queue:
+            await log.append(EVENT)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    commits = log.commits
+    await log.stop()
+    return elapsed, commits
+
+
+async def run_fsync_per_event(directory, events, concurrency):
+    # pembanding: tiap event ditulis + fsync sendiri (di thread pool)
+    path = os.path.join(directory, "naive.jsonl")
+    line = (json.dumps(EVENT, separators=(",", ":")) + "\n").encode()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    loop = asyncio.get_running_loop()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    queue = iter(range(events))
+
+    def write_one():
+        os.write(fd, line)
+        os.fsync(fd)
+
+    async def worker():
+        for _ in queue:
+            await loop.run_in_executor(pool, write_one)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    os.close(fd)
+    pool.shutdown()
+    return elapsed, events
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    print(f"{'mode':<18} {'concurrency':>11} {'events/s':>10} {'fsyncs':>8} {'ev/fsync':>9}")
+    for concurrency in args.concurrency:
+        for name, fn in (("fsync_per_event", run_fsync_per_event), ("group_commit", run_group_commit)):
+            directory = tempfile.mkdtemp(prefix="bench_audit_")
+            try:
+                elapsed, fsyncs = asyncio.run(fn(directory, args.events, concurrency))
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+            print(f"{name:<18} {concurrency:>11} {args.events / elapsed:>10.0f} "
+                  f"{fsyncs:>8} {args.events / fsyncs:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Benchmark /download: byte terkirim & latency untuk download pertama,
+# download ulang dengan If-None-Match (304) dan resume dengan Range (206).
+#
+#   python -m benchmarks.bench_download --size-mb 50 --repeat 20
+#
+# Upload, database, registry, audit log dan profil memakai folder sementara.
+import argparse, os, shutil, statistics, sys, tempfile, time, warnings
+
+
+def timed(client, url, repeat, headers=None):
+    samples, sent, status = [], 0, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        r = client.get(url, headers=headers or {})
+        samples.append((time.perf_counter() - start) * 1000)
+        sent += len(r.content)
+        status = r.status_code
+    return status, sent / repeat, statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_download_")
+    os.environ["UPLOAD_DIR"] = os.path.join(tmp, "uploads")
+    os.environ["SIGNATURE_DB"] = os.path.join(tmp, "signature.db")
+    os.environ["REGISTRY_PATH"] = os.path.join(tmp, "verification_registry.json")
+    os.environ["AUDIT_DIR"] = os.path.join(tmp, "audit")
+    os.environ["PROFILE_DIR"] = os.path.join(tmp, "profiles")
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    from fastapi.testclient import TestClient
+    from benchmarks.synthetic import make_pdf, MB
+    import main as app_main
+
+    pdf_path = make_pdf(os.path.join(tmp, "doc.pdf"), pages=10, size=args.size_mb * MB)
+
+    try:
+        run(TestClient(app_main.app), pdf_path, args.repeat)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run(test_client, pdf_path, repeat):
+    with test_client as client:
+        with open(pdf_path, "rb") as f:
+            r = client.post("/sign", files={"file": ("doc.pdf", f, "application/pdf")})
+        url = "/download/" + r.json()["verification_id"]
+
+        first = client.get(url)
+        etag = first.headers["etag"]
+        half = int(first.headers["content-length"]) // 2
+
+        print("case\tstatus\tbytes_sent\tp50_ms\tmax_ms")
+        for name, headers in (
+            ("full", None),
+            ("if-none-match", {"If-None-Match": etag}),
+            ("range-resume", {"Range": f"bytes={half}-", "If-Range": etag}),
+        ):
+            status, sent, p50, worst = timed(client, url, repeat, headers)
+            print(f"{name}\t{status}\t{sent:.0f}\t{p50:.2f}\t{worst:.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Benchmark hashing dokumen: throughput (MB/s) dan peak RSS
+# (SHA-256 streaming via path/file object, dan Merkle paralel)
+#
+# Jalankan dari folder backend:
+#   python -m benchmarks.bench_hash
+#   python -m benchmarks.bench_hash --sizes 1 10 100 1024
+#   python -m benchmarks.bench_hash --algorithms SHA-256 SHA-512 BLAKE2b BLAKE3
+#
+# Setiap ukuran diukur di subprocess terpisah supaya peak RSS
+# (ru_maxrss) tidak tercampur antar ukuran.
+import argparse, os, resource, subprocess, sys, tempfile, time
+
+from crypto.hashing import HASH_ALGORITHMS, hash_document
+from crypto.merkle import merkle_tree
+
+MB = 1024 * 1024
+DEFAULT_SIZES = [1, 10, 100, 1024]
+
+
+def make_file(path, size_mb):
+    block = os.urandom(MB)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def peak_rss_mb():
+    # Linux: KiB, macOS: bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return rss / MB
+    return rss / 1024
+
+
+def run_one(path, mode, algorithm):
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+
+    if mode == "path":
+        hash_document(path, algorithm=algorithm)
+    elif mode == "merkle":
+        # chunk paralel di semua core (SHA-256-MERKLE)
+        merkle_tree(path)
+    else:
+        with open(path, "rb") as f:
+            hash_document(f, algorithm=algorithm)
+
+    elapsed = time.perf_counter() - start
+    print(f"{size / MB:.0f}\t{mode}\t{algorithm}\t{size / MB / elapsed:.1f}\t{peak_rss_mb():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES,
+                        help="ukuran dokumen dalam MB")
+    parser.add_argument("--algorithms", nargs="+", default=list(HASH_ALGORITHMS),
+                        help="algoritma yang dibandingkan: " + ", ".join(HASH_ALGORITHMS))
+    parser.add_argument("--child", nargs=3, metavar=("PATH", "MODE", "ALGORITHM"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(*args.child)
+        return
+
+    algorithms = [a for a in args.algorithms if a in HASH_ALGORITHMS]
+    skipped = [a for a in args.algorithms if a not in HASH_ALGORITHMS]
+    if skipped:
+        print("Dilewati (tidak tersedia): " + ", ".join(skipped))
+
+    print("size_mb\tmode\talgorithm\tMB/s\tpeak_rss_mb")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            path = os.path.join(tmp, f"doc_{size_mb}mb.pdf")
+            make_file(path, size_mb)
+            runs = [("path", a) for a in algorithms]
+            runs += [("fileobj", "SHA-256"), ("merkle", "SHA-256")]
+            for mode, algorithm in runs:
+                subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_hash",
+                     "--child", path, mode, algorithm],
+                    check=True
+                )
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Benchmark sidecar signature: ukuran dan kecepatan parse + verifikasi
+# .sig.json (json.loads + kanonikalisasi ulang) vs .sig.bin.
+# Hash dokumen tidak ikut diukur (digest diberikan langsung).
+#
+#   python -m benchmarks.bench_sidecar --iterations 20000
+import argparse, json, sys, time
+
+from nacl.signing import SigningKey
+
+from crypto.sign import sign_document
+from crypto.verify import verify_document
+from crypto.sidecar import encode_sidecar, decode_sidecar, verify_binary
+from crypto.hashing import hash_document
+
+
+def bench(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed, elapsed / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    document = b"%PDF-1.4\n" + b"x" * 4096
+    digest = hash_document(document)
+    signing_key = SigningKey.generate()
+    verify_key = signing_key.verify_key
+
+    signature_json = sign_document(document, signing_key, "Benchmark")
+    json_bytes = json.dumps(signature_json, indent=2).encode()
+    bin_bytes = encode_sidecar(signature_json)
+
+    cases = [
+        ("json", len(json_bytes),
+         lambda: json.loads(json_bytes),
+         lambda: verify_document(None, json.loads(json_bytes), verify_key, document_hash=digest)),
+        ("bin", len(bin_bytes),
+         lambda: decode_sidecar(bin_bytes),
+         lambda: verify_binary(None, bin_bytes, verify_key, document_hash=digest)),
+    ]
+
+    print("format\tbytes\tparse_ops/s\tparse_us\tverify_ops/s\tverify_us")
+    for name, size, parse, verify in cases:
+        assert verify()[0]
+        parse_ops, parse_us = bench(parse, args.iterations)
+        verify_ops, verify_us = bench(verify, args.iterations // 4)
+        print(f"{name}\t{size}\t{parse_ops:.0f}\t{parse_us:.2f}\t{verify_ops:.0f}\t{verify_us:.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
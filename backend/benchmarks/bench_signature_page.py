@@ -0,0 +1,88 @@
+# Microbenchmark render halaman tanda tangan: reportlab canvas (lama)
+# vs template yang di-cache (crypto.pdf_signature), dengan QR dari
+# qr.png atau QR vektor langsung dari URL.
+#
+#   python -m benchmarks.bench_signature_page --iterations 200
+import argparse, os, statistics, tempfile, time
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from crypto.pdf_signature import create_signature_page
+from crypto.qr import generate_qr
+
+
+def create_signature_page_canvas(output_path, signer, timestamp, algorithm, qr_path):
+    # implementasi lama: canvas baru per dokumen
+    c = canvas.Canvas(output_path, pagesize=A4)
+    width, height = A4
+
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(50, height - 80, "DIGITAL SIGNATURE")
+
+    c.setFont("Helvetica", 11)
+    c.drawString(50, height - 120, f"Penandatangan : {signer}")
+    c.drawString(50, height - 145, f"Waktu         : {timestamp}")
+    c.drawString(50, height - 170, f"Algoritma     : {algorithm}")
+
+    c.drawString(50, height - 210,
+        "Dokumen ini telah ditandatangani secara digital."
+    )
+    c.drawString(50, height - 230,
+        "Perubahan sekecil apapun akan membuat signature tidak valid."
+    )
+
+    c.drawImage(qr_path, 50, height - 400, width=120, height=120)
+
+    c.showPage()
+    c.save()
+
+
+def measure(fn, iterations, **kwargs):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(**kwargs)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        qr_path = os.path.join(tmp, "qr.png")
+        url = "http://localhost:8000/verify-public?id=0123456789"
+        kwargs = {
+            "output_path": os.path.join(tmp, "signature_page.pdf"),
+            "signer": "Roby Sunjaya",
+            "timestamp": "2026-01-10T14:13:32.711198+07:00",
+            "algorithm": "Ed25519",
+            "qr_path": qr_path
+        }
+
+        def png_then(fn):
+            # alur lama: tulis qr.png dulu, lalu baca lagi saat render
+            def run(**kw):
+                generate_qr(url, qr_path)
+                fn(**kw)
+            return run
+
+        def vector(**kw):
+            kw = dict(kw, qr_path=None, qr_data=url)
+            create_signature_page(**kw)
+
+        print("impl\tmean_ms\tp50_ms\tp99_ms")
+        for name, fn in (("canvas+png", png_then(create_signature_page_canvas)),
+                         ("template+png", png_then(create_signature_page)),
+                         ("template+vector", vector)):
+            fn(**kwargs)  # warm-up (font, template, cache QR)
+            mean, p50, p99 = measure(fn, args.iterations, **kwargs)
+            print(f"{name}\t{mean:.3f}\t{p50:.3f}\t{p99:.3f}")
+
+
+if __name__ == "__main__":
+    main()
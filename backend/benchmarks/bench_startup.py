@@ -0,0 +1,146 @@
+# Laporan cold start backend: berapa lama `import main` dan startup hook,
+# plus rincian ala `python -X importtime` (modul/paket termahal).
+#
+# Jalankan dari folder backend:
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --repeat 10 --top 25
+#   python -m benchmarks.bench_startup --json > startup.json
+#
+# Tiap pengukuran memakai interpreter baru (subprocess) dengan UPLOAD_DIR,
+# database, registry, audit log dan folder profil sementara, jadi data asli
+# tidak tersentuh.
+# Startup diukur dengan WARM_IMPORTS=0 dan =1.
+import argparse, json, os, re, shutil, statistics, subprocess, sys, tempfile, time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:       self [us] |  cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def child_env(tmp, warm):
+    env = dict(os.environ)
+    env.update({
+        "UPLOAD_DIR": os.path.join(tmp, "uploads"),
+        "SIGNATURE_DB": os.path.join(tmp, "signature.db"),
+        "REGISTRY_PATH": os.path.join(tmp, "verification_registry.json"),
+        "AUDIT_DIR": os.path.join(tmp, "audit"),
+        "PROFILE_DIR": os.path.join(tmp, "profiles"),
+        "WARM_IMPORTS": "1" if warm else "0",
+    })
+    return env
+
+
+def run_child():
+    start = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    from fastapi.testclient import TestClient
+    client = TestClient(main.app)
+    started = time.perf_counter()
+    client.__enter__()  # jalankan startup hook
+    ready = time.perf_counter()
+    client.__exit__(None, None, None)
+
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "startup_ms": (ready - started) * 1000
+    }))
+
+
+def measure(tmp, warm, repeat):
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+            cwd=BACKEND_DIR, env=child_env(tmp, warm),
+            check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        key: statistics.median(s[key] for s in samples)
+        for key in ("import_ms", "startup_ms")
+    }
+
+
+def importtime(tmp):
+    # satu kali `python -X importtime -c "import main"`, diparse jadi list
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=child_env(tmp, False),
+        check=True, capture_output=True, text=True
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m:
+            modules.append({
+                "module": m.group(4),
+                "self_ms": int(m.group(1)) / 1000,
+                "cumulative_ms": int(m.group(2)) / 1000,
+                "depth": len(m.group(3)) // 2
+            })
+    return modules
+
+
+def by_package(modules):
+    totals = {}
+    for m in modules:
+        package = m["module"].split(".")[0]
+        totals[package] = totals.get(package, 0.0) + m["self_ms"]
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return 0
+
+    tmp = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        cold = measure(tmp, False, args.repeat)
+        warm = measure(tmp, True, args.repeat)
+        modules = importtime(tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    packages = by_package(modules)
+    main_entry = next((m for m in modules if m["module"] == "main"), None)
+    direct = sorted((m for m in modules if m["depth"] == 1 and main_entry),
+                    key=lambda m: m["cumulative_ms"], reverse=True)
+
+    if args.json:
+        print(json.dumps({
+            "WARM_IMPORTS=0": cold,
+            "WARM_IMPORTS=1": warm,
+            "import_main_ms": main_entry["cumulative_ms"] if main_entry else None,
+            "packages": dict(packages[:args.top]),
+            "main_imports": {m["module"]: m["cumulative_ms"] for m in direct[:args.top]}
+        }, indent=2))
+        return 0
+
+    print(f"{'config':<16} {'import_ms':>10} {'startup_ms':>11} {'total_ms':>10}")
+    for name, r in (("WARM_IMPORTS=0", cold), ("WARM_IMPORTS=1", warm)):
+        print(f"{name:<16} {r['import_ms']:>10.1f} {r['startup_ms']:>11.1f} "
+              f"{r['import_ms'] + r['startup_ms']:>10.1f}")
+
+    print(f"\nImport langsung dari main (cumulative, -X importtime)")
+    for m in direct[:args.top]:
+        print(f"  {m['module']:<40} {m['cumulative_ms']:>9.1f} ms")
+
+    print(f"\nPaket termahal (total self time)")
+    for package, total in packages[:args.top]:
+        print(f"  {package:<40} {total:>9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
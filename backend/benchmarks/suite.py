@@ -0,0 +1,216 @@
+# Suite microbenchmark untuk setiap tahap pipeline tanda tangan:
+# sign_document, verify_document, generate_qr, create_signature_page,
+# merge_pdf. Input berupa PDF sintetis (benchmarks/synthetic.py).
+#
+#   python -m benchmarks.suite                          # profil kecil
+#   python -m benchmarks.suite --profiles all
+#   python -m benchmarks.suite --save-baseline          # simpan baseline.json
+#   python -m benchmarks.suite --compare --threshold 0.2
+#
+# Setiap (profil, tahap) dijalankan di subprocess sendiri supaya peak RSS
+# tidak tercampur. --compare keluar dengan kode 1 jika p50 sebuah tahap
+# lebih lambat dari baseline melebihi threshold.
+import argparse, json, os, resource, shutil, statistics, subprocess, sys, tempfile, time
+
+from benchmarks.synthetic import make_pdf, MB
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+PROFILES = {
+    "1p-10KB": (1, 10 * 1024),
+    "10p-1MB": (10, MB),
+    "100p-50MB": (100, 50 * MB),
+    "1000p-500MB": (1000, 500 * MB),
+}
+SMALL_PROFILES = ["1p-10KB", "10p-1MB"]
+
+# tahap yang biayanya tidak bergantung ukuran dokumen cukup diukur sekali
+STAGES = ["sign_document", "verify_document", "generate_qr", "create_signature_page", "merge_pdf"]
+SIZE_INDEPENDENT = {"generate_qr", "create_signature_page"}
+
+QR_URL = "http://localhost:8000/verify-public?id=0123456789"
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / MB if sys.platform == "darwin" else rss / 1024
+
+
+def prepare_stage(stage, workdir, pdf_path):
+    # kembalikan fungsi tanpa argumen yang menjalankan satu operasi
+    from nacl.signing import SigningKey
+
+    signing_key = SigningKey.generate()
+
+    if stage == "sign_document":
+        from crypto.sign import sign_document
+        return lambda: sign_document(pdf_path, signing_key, "Benchmark")
+
+    if stage == "verify_document":
+        from crypto.sign import sign_document
+        from crypto.verify import verify_document
+        signature = sign_document(pdf_path, signing_key, "Benchmark")
+        verify_key = signing_key.verify_key
+
+        def run():
+            valid, _ = verify_document(pdf_path, signature, verify_key)
+            assert valid
+        return run
+
+    if stage == "generate_qr":
+        from crypto.qr import generate_qr
+        qr_path = os.path.join(workdir, "qr.png")
+        return lambda: generate_qr(QR_URL, qr_path)
+
+    if stage == "create_signature_page":
+        from crypto.pdf_signature import create_signature_page
+        page_path = os.path.join(workdir, "signature_page.pdf")
+        return lambda: create_signature_page(
+            output_path=page_path,
+            signer="Benchmark",
+            timestamp="2026-01-10T14:13:32.711198+07:00",
+            algorithm="Ed25519",
+            qr_data=QR_URL
+        )
+
+    if stage == "merge_pdf":
+        from crypto.pdf_signature import create_signature_page
+        from crypto.merge_pdf import merge_pdf
+        page_path = os.path.join(workdir, "signature_page.pdf")
+        create_signature_page(page_path, "Benchmark", "2026", "Ed25519", qr_data=QR_URL)
+        out_path = os.path.join(workdir, "SIGNED.pdf")
+        return lambda: merge_pdf(pdf_path, page_path, out_path)
+
+    raise ValueError(stage)
+
+
+def run_child(stage, pdf_path, min_iterations, max_seconds):
+    workdir = tempfile.mkdtemp(prefix="bench_stage_")
+    try:
+        op = prepare_stage(stage, workdir, pdf_path)
+        op()  # warm-up
+
+        samples = []
+        deadline = time.perf_counter() + max_seconds
+        while len(samples) < min_iterations or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            op()
+            samples.append(time.perf_counter() - start)
+            if len(samples) >= min_iterations and time.perf_counter() >= deadline:
+                break
+            if len(samples) >= 10000:
+                break
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    samples.sort()
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+    print(json.dumps({
+        "iterations": len(samples),
+        "ops_per_s": len(samples) / sum(samples),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "mean_ms": statistics.mean(samples) * 1000,
+        "peak_rss_mb": peak_rss_mb()
+    }))
+
+
+def run_suite(profiles, stages, min_iterations, max_seconds):
+    results = {}
+    tmp = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        measured_independent = set()
+        for profile in profiles:
+            pages, size = PROFILES[profile]
+            pdf_path = make_pdf(os.path.join(tmp, profile + ".pdf"), pages=pages, size=size)
+            for stage in stages:
+                if stage in SIZE_INDEPENDENT:
+                    if stage in measured_independent:
+                        continue
+                    measured_independent.add(stage)
+                    key = stage
+                else:
+                    key = f"{stage}[{profile}]"
+
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.suite", "--child", stage, pdf_path,
+                     "--min-iterations", str(min_iterations),
+                     "--max-seconds", str(max_seconds)],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                results[key] = json.loads(out.strip().splitlines()[-1])
+                r = results[key]
+                print(f"{key:<36} {r['ops_per_s']:>10.1f} {r['p50_ms']:>10.3f} "
+                      f"{r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['peak_rss_mb']:>8.1f}")
+            os.remove(pdf_path)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        change = r["p50_ms"] / base["p50_ms"] - 1
+        status = "REGRESSION" if change > threshold else "ok"
+        print(f"{key:<36} {base['p50_ms']:>10.3f} -> {r['p50_ms']:>10.3f} ms  {change:+.1%}  {status}")
+        if change > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="+", default=SMALL_PROFILES,
+                        help="nama profil atau 'all': " + ", ".join(PROFILES))
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=2.0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="batas kenaikan p50 relatif terhadap baseline (0.20 = 20%%)")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.min_iterations, args.max_seconds)
+        return 0
+
+    profiles = list(PROFILES) if args.profiles == ["all"] else args.profiles
+    print(f"{'stage':<36} {'ops/s':>10} {'p50_ms':>10} {'p95_ms':>10} {'p99_ms':>10} {'rss_mb':>8}")
+    results = run_suite(profiles, args.stages, args.min_iterations, args.max_seconds)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline disimpan: {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print("Baseline belum ada, jalankan dengan --save-baseline dulu")
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("Regresi: " + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# PDF sintetis untuk benchmark: jumlah halaman dan ukuran file bisa diatur.
+# Ukuran dicapai dengan stream biner acak (tidak terkompresi) yang
+# dirujuk dari halaman pertama, mirip hasil scan.
+import os
+
+MB = 1024 * 1024
+
+
+def make_pdf(path, pages=1, size=10 * 1024):
+    offsets = []
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        def obj(num, body):
+            offsets.append((num, f.tell()))
+            f.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+        first_page = 4
+        kids = b" ".join(b"%d 0 R" % (first_page + i * 2) for i in range(pages))
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages))
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+        padding_num = first_page + pages * 2
+        for i in range(pages):
+            num = first_page + i * 2
+            xobj = b" /XObject << /Pad %d 0 R >>" % padding_num if i == 0 else b""
+            obj(num, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842]"
+                     b" /Resources << /Font << /F1 3 0 R >>%s >> /Contents %d 0 R >>"
+                     % (xobj, num + 1))
+            content = b"BT /F1 12 Tf 72 760 Td (Halaman %d) Tj ET" % (i + 1)
+            obj(num + 1, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+
+        # isi sisa ukuran dengan stream acak
+        remaining = max(0, size - f.tell() - 300)
+        offsets.append((padding_num, f.tell()))
+        f.write(b"%d 0 obj\n<< /Type /XObject /Subtype /Form /BBox [0 0 1 1]"
+                b" /Length %d >>\nstream\n" % (padding_num, remaining))
+        block = os.urandom(min(remaining, MB)) if remaining else b""
+        written = 0
+        while written < remaining:
+            n = min(len(block), remaining - written)
+            f.write(block[:n])
+            written += n
+        f.write(b"\nendstream\nendobj\n")
+
+        xref_at = f.tell()
+        size_entries = padding_num + 1
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % size_entries)
+        for _, off in sorted(offsets):
+            f.write(b"%010d 00000 n \n" % off)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (size_entries, xref_at))
+    return path
@@ -0,0 +1,141 @@
+# Validasi sertifikat penandatangan ("Mini X.509", certificates/*.cert.json
+# yang diterbitkan ca/issue_cert.py).
+#
+# Sertifikat disisipkan di signature JSON (kunci "certificate") saat tanda
+# tangan. Saat verifikasi dicek:
+#   - tanda tangan CA atas json.dumps(cert tanpa ca_signature, sort_keys=True)
+#   - masa berlaku: sekarang dan saat dokumen ditandatangani (timestamp)
+#   - binding: public key sertifikat = key yang memverifikasi signature,
+#     nama subject = nama penandatangan
+#
+# Hasil parse + cek tanda tangan CA di-cache per hash sertifikat, jadi
+# Ed25519 milik CA dijalankan sekali per sertifikat, bukan per dokumen.
+from collections import namedtuple
+from datetime import datetime, timezone
+import base64, hashlib, json, time
+
+from crypto.keyring import as_verify_key
+from utils.lru import LRUCache
+
+Certificate = namedtuple("Certificate", "serial_number subject_name public_key not_before not_after")
+
+
+class CertificateError(ValueError):
+    pass
+
+
+def certificate_payload(cert):
+    # byte yang ditandatangani CA (sama dengan ca/issue_cert.py)
+    payload = {k: v for k, v in cert.items() if k != "ca_signature"}
+    return json.dumps(payload, sort_keys=True).encode()
+
+
+def certificate_hash(cert):
+    return hashlib.sha256(json.dumps(cert, sort_keys=True).encode()).hexdigest()
+
+
+def _parse_time(value):
+    # "2028-01-01T00:00:00Z" / isoformat(); tanpa zona dianggap UTC
+    t = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return t if t.tzinfo is not None else t.replace(tzinfo=timezone.utc)
+
+
+def parse_certificate(cert, ca_key):
+    """Cek tanda tangan CA lalu kembalikan Certificate.
+
+    Melempar CertificateError jika sertifikat rusak atau tanda tangan CA
+    tidak valid. Masa berlaku tidak dicek di sini (lihat
+    CertificateValidator.check).
+    """
+    if not isinstance(cert, dict) or cert.get("signature_algorithm") != "Ed25519":
+        raise CertificateError("Algoritma sertifikat tidak didukung")
+    try:
+        ca_signature = base64.b64decode(cert["ca_signature"], validate=True)
+        parsed = Certificate(
+            cert.get("serial_number"),
+            cert["subject"]["name"],
+            base64.b64decode(cert["public_key"], validate=True),
+            _parse_time(cert["validity"]["not_before"]),
+            _parse_time(cert["validity"]["not_after"])
+        )
+    except (KeyError, TypeError, AttributeError, ValueError):
+        raise CertificateError("Sertifikat tidak valid")
+
+    try:
+        as_verify_key(ca_key).verify(certificate_payload(cert), ca_signature)
+    except Exception:
+        raise CertificateError("Tanda tangan CA pada sertifikat TIDAK VALID")
+    return parsed
+
+
+class CertificateValidator:
+    """CA tepercaya + cache sertifikat yang sudah dicek.
+
+    Cache: hash sertifikat -> Certificate (atau pesan error untuk
+    sertifikat yang ditolak). Entri sertifikat valid paling lama hidup
+    sampai not_after, jadi sertifikat kedaluwarsa tidak tertahan di cache.
+    require=True: signature tanpa sertifikat dianggap tidak valid.
+    """
+
+    def __init__(self, ca_key, require=False, maxsize=1024, ttl=3600.0):
+        self._ca_source = ca_key
+        self._ca_key = None
+        self.require = require
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def load(self):
+        # panggil saat startup supaya error key CA langsung ketahuan
+        self._ca_key = as_verify_key(self._ca_source)
+        return self
+
+    @property
+    def ca_key(self):
+        if self._ca_key is None:
+            self.load()
+        return self._ca_key
+
+    def certificate(self, cert):
+        key = certificate_hash(cert)
+        cached = self.cache.get(key)
+        if cached is None:
+            try:
+                cached = parse_certificate(cert, self.ca_key)
+                ttl = min(self.cache.ttl, cached.not_after.timestamp() - time.time())
+            except CertificateError as e:
+                cached, ttl = str(e), self.cache.ttl
+            if ttl > 0:
+                self.cache.put(key, cached, ttl=ttl)
+        if isinstance(cached, str):
+            raise CertificateError(cached)
+        return cached
+
+    def check(self, signature_json, verify_key, now=None):
+        """(valid, message) untuk sertifikat di signature_json."""
+        cert = signature_json.get("certificate")
+        if cert is None:
+            if self.require:
+                return False, "Sertifikat penandatangan tidak ada"
+            return True, None
+
+        try:
+            c = self.certificate(cert)
+        except CertificateError as e:
+            return False, str(e)
+
+        now = now or datetime.now(timezone.utc)
+        if now < c.not_before:
+            return False, "Sertifikat belum berlaku"
+        if now > c.not_after:
+            return False, "Sertifikat kedaluwarsa"
+        try:
+            signed_at = _parse_time(signature_json["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            return False, "Timestamp signature tidak valid"
+        if not c.not_before <= signed_at <= c.not_after:
+            return False, "Dokumen ditandatangani di luar masa berlaku sertifikat"
+
+        if c.public_key != as_verify_key(verify_key).encode():
+            return False, "Public key tidak sesuai sertifikat"
+        if c.subject_name != signature_json.get("signer", {}).get("name"):
+            return False, "Nama penandatangan tidak sesuai sertifikat"
+        return True, None
@@ -0,0 +1,72 @@
+import hashlib, os
+
+try:
+    import blake3
+except ImportError:  # opsional: pip install blake3
+    blake3 = None
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB per baca
+
+# Registry algoritma hash: nama di signature JSON ("hash_algorithm") ->
+# konstruktor objek hash (update/digest)
+HASH_ALGORITHMS = {
+    "SHA-256": hashlib.sha256,
+    "SHA-512": hashlib.sha512,
+    "BLAKE2b": hashlib.blake2b,
+}
+if blake3 is not None:
+    HASH_ALGORITHMS["BLAKE3"] = blake3.blake3
+
+DEFAULT_HASH_ALGORITHM = "SHA-256"
+
+
+class UnsupportedHashAlgorithm(ValueError):
+    pass
+
+
+def new_hasher(algorithm=DEFAULT_HASH_ALGORITHM):
+    try:
+        return HASH_ALGORITHMS[algorithm]()
+    except KeyError:
+        raise UnsupportedHashAlgorithm(algorithm)
+
+
+def _update_from_file(h, f, chunk_size):
+    # buffer dipakai ulang supaya memori tetap konstan
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    readinto = getattr(f, "readinto", None)
+
+    if readinto is None:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+        return
+
+    while True:
+        n = readinto(buf)
+        if not n:
+            break
+        h.update(view[:n])
+
+
+def hash_document(source, chunk_size=CHUNK_SIZE, algorithm=DEFAULT_HASH_ALGORITHM):
+    """Hitung hash dokumen secara streaming (default SHA-256).
+
+    source boleh berupa path, file object (mode binary) atau buffer bytes.
+    """
+    h = new_hasher(algorithm)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for i in range(0, len(view), chunk_size):
+            h.update(view[i:i + chunk_size])
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb", buffering=0) as f:
+            _update_from_file(h, f, chunk_size)
+    else:
+        _update_from_file(h, source, chunk_size)
+
+    return h.digest()
@@ -0,0 +1,101 @@
+import os, threading, time
+
+
+def _key_class(name):
+    # PyNaCl dimuat saat key pertama kali dipakai, bukan saat import
+    from nacl import signing
+    return getattr(signing, name)
+
+
+class _CachedKey:
+    # satu file key + objek hasil parse, di-reload jika file berganti
+    def __init__(self, path, key_class, check_interval):
+        # key_class: nama kelas di nacl.signing ("SigningKey"/"VerifyKey")
+        self.path = path
+        self.key_class = key_class
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._state = None  # (stat_id, key_object)
+        self._next_check = 0.0
+
+    @staticmethod
+    def _stat_id(path):
+        st = os.stat(path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        stat_id = self._stat_id(self.path)
+        with open(self.path, "rb") as f:
+            key = _key_class(self.key_class)(f.read())
+        # swap sekaligus (atomic), pembaca lama tetap memegang objek lama
+        self._state = (stat_id, key)
+
+    def get(self):
+        state = self._state
+        now = time.monotonic()
+
+        if state is not None and now < self._next_check:
+            return state[1]
+
+        with self._lock:
+            state = self._state
+            if state is None or self._stat_id(self.path) != state[0]:
+                self._load()
+            self._next_check = now + self.check_interval
+            return self._state[1]
+
+
+class KeyRing:
+    """Cache key Ed25519 di memori.
+
+    Key dibaca sekali, lalu hanya di-reload jika inode/mtime/size file
+    berubah. Pengecekan stat dibatasi paling sering sekali per
+    check_interval detik.
+    """
+
+    def __init__(self, private_key_path=None, public_key_path=None, check_interval=1.0):
+        self._signing = None
+        self._verify = None
+        if private_key_path:
+            self._signing = _CachedKey(private_key_path, "SigningKey", check_interval)
+        if public_key_path:
+            self._verify = _CachedKey(public_key_path, "VerifyKey", check_interval)
+
+    def load(self):
+        # panggil saat startup supaya error key langsung ketahuan
+        if self._signing:
+            self._signing.get()
+        if self._verify:
+            self._verify.get()
+        return self
+
+    def signing_key(self):
+        if self._signing is None:
+            raise RuntimeError("Private key tidak dikonfigurasi")
+        return self._signing.get()
+
+    def verify_key(self):
+        if self._verify is None:
+            raise RuntimeError("Public key tidak dikonfigurasi")
+        return self._verify.get()
+
+
+def as_signing_key(key):
+    # terima objek SigningKey, 32 byte seed, atau path (kompatibel dengan versi lama)
+    SigningKey = _key_class("SigningKey")
+    if isinstance(key, SigningKey):
+        return key
+    if isinstance(key, (bytes, bytearray)):
+        return SigningKey(bytes(key))
+    with open(key, "rb") as f:
+        return SigningKey(f.read())
+
+
+def as_verify_key(key):
+    VerifyKey = _key_class("VerifyKey")
+    if isinstance(key, VerifyKey):
+        return key
+    if isinstance(key, (bytes, bytearray)):
+        return VerifyKey(bytes(key))
+    with open(key, "rb") as f:
+        return VerifyKey(f.read())
@@ -1,8 +1,287 @@
-from PyPDF2 import PdfMerger
+from io import BytesIO
+import os, re
 
-def merge_pdf(original_pdf, signature_pdf, output_pdf):
+from utils.fileops import clone_file
+
+# PyPDF2 (~50 ms import) baru dimuat saat merge pertama, bukan saat modul
+# ini di-import; _load_pypdf() mengisi nama-nama di bawah.
+PdfMerger = PdfReader = None
+ArrayObject = DictionaryObject = IndirectObject = NameObject = None
+NumberObject = StreamObject = None
+_pypdf_loaded = False
+
+
+def _load_pypdf():
+    global PdfMerger, PdfReader, ArrayObject, DictionaryObject, IndirectObject
+    global NameObject, NumberObject, StreamObject, _pypdf_loaded
+    if _pypdf_loaded:
+        return
+    from PyPDF2 import PdfMerger, PdfReader
+    from PyPDF2.generic import (
+        ArrayObject, DictionaryObject, IndirectObject, NameObject,
+        NumberObject, StreamObject
+    )
+    # diset terakhir: thread lain tidak melihat nama yang masih None
+    _pypdf_loaded = True
+
+# mode="incremental": byte dokumen asli disalin apa adanya, lalu halaman
+# tanda tangan ditambahkan sebagai PDF incremental update (objek baru,
+# objek Pages yang diperbarui, xref dan trailer baru). Biayanya sebanding
+# dengan ukuran halaman tanda tangan, bukan ukuran dokumen.
+#
+# mode="rewrite": cara lama, PdfMerger mem-parse dan menulis ulang semua
+# objek. Dipakai juga sebagai fallback (mis. PDF terenkripsi).
+
+
+class IncrementalUpdateError(Exception):
+    pass
+
+
+def merge_pdf(original_pdf, signature_pdf, output_pdf, mode="incremental"):
+    if mode == "incremental":
+        try:
+            append_incremental(original_pdf, signature_pdf, output_pdf)
+            return
+        except IncrementalUpdateError:
+            pass
+    merge_pdf_rewrite(original_pdf, signature_pdf, output_pdf)
+
+
+def merge_pdf_rewrite(original_pdf, signature_pdf, output_pdf):
+    _load_pypdf()
     merger = PdfMerger()
     merger.append(original_pdf)
     merger.append(signature_pdf)
     merger.write(output_pdf)
     merger.close()
+
+
+def _find_startxref(f, size):
+    f.seek(max(0, size - 2048))
+    tail = f.read()
+    matches = re.findall(rb"startxref\s+(\d+)", tail)
+    if not matches:
+        raise IncrementalUpdateError("startxref tidak ditemukan")
+    offset = int(matches[-1])
+
+    f.seek(offset)
+    head = f.read(32).lstrip()
+    if head.startswith(b"xref"):
+        return offset, False
+    if re.match(rb"\d+\s+\d+\s+obj", head):
+        return offset, True  # cross-reference stream
+    raise IncrementalUpdateError("offset startxref tidak valid")
+
+
+def _collect(obj, keys):
+    # kumpulkan semua indirect object yang dirujuk halaman tanda tangan
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in keys:
+            keys.append(key)
+            _collect(obj.get_object(), keys)
+    elif isinstance(obj, DictionaryObject):
+        for k, v in obj.items():
+            if k != "/Parent":
+                _collect(v, keys)
+    elif isinstance(obj, ArrayObject):
+        for v in obj:
+            _collect(v, keys)
+
+
+def _remap(obj, mapping):
+    # salin objek dengan nomor objek baru
+    if isinstance(obj, IndirectObject):
+        return IndirectObject(mapping[(obj.idnum, obj.generation)], 0, None)
+    if isinstance(obj, StreamObject):
+        new = obj.__class__()
+        new._data = obj._data
+        for k, v in obj.items():
+            new[NameObject(k)] = _remap(v, mapping)
+        return new
+    if isinstance(obj, DictionaryObject):
+        new = DictionaryObject()
+        for k, v in obj.items():
+            new[NameObject(k)] = _remap(v, mapping)
+        return new
+    if isinstance(obj, ArrayObject):
+        return ArrayObject([_remap(v, mapping) for v in obj])
+    return obj
+
+
+def _serialize(num, gen, obj):
+    buf = BytesIO()
+    buf.write(b"%d %d obj\n" % (num, gen))
+    obj.write_to_stream(buf, None)
+    buf.write(b"\nendobj\n")
+    return buf.getvalue()
+
+
+def _subsections(nums):
+    nums = sorted(nums)
+    start = prev = nums[0]
+    group = [start]
+    for n in nums[1:]:
+        if n == prev + 1:
+            group.append(n)
+        else:
+            yield start, group
+            start, group = n, [n]
+        prev = n
+    yield start, group
+
+
+def _next_object_number(reader):
+    # /Size tidak selalu ikut ke trailer PyPDF2 untuk xref stream
+    nums = [num for section in reader.xref.values() for num in section]
+    nums += list(reader.xref_objStm)
+    size = int(reader.trailer.get("/Size", 0))
+    return max([size] + [num + 1 for num in nums])
+
+
+def append_incremental(original_pdf, signature_pdf, output_pdf):
+    _load_pypdf()
+    size = os.path.getsize(original_pdf)
+
+    with open(original_pdf, "rb") as f:
+        prev_xref, xref_is_stream = _find_startxref(f, size)
+        f.seek(size - 1)
+        needs_newline = f.read(1) not in (b"\n", b"\r")
+
+        # hanya xref + trailer + objek Pages yang dibaca (lazy)
+        f.seek(0)
+        try:
+            reader = PdfReader(f)
+        except Exception as e:
+            raise IncrementalUpdateError(str(e))
+        if reader.is_encrypted:
+            raise IncrementalUpdateError("PDF terenkripsi")
+
+        trailer = reader.trailer
+        root = trailer["/Root"].get_object()
+        pages_ref = root.raw_get("/Pages")
+        if not isinstance(pages_ref, IndirectObject):
+            raise IncrementalUpdateError("/Pages bukan indirect object")
+        pages = pages_ref.get_object()
+        kids = pages["/Kids"]
+        next_num = _next_object_number(reader)
+
+        # objek baru: halaman tanda tangan + semua resource-nya
+        with open(signature_pdf, "rb") as sf:
+            sig_reader = PdfReader(sf)
+            sig_page = sig_reader.pages[0]
+            page_ref = sig_page.indirect_reference
+            keys = [(page_ref.idnum, page_ref.generation)]
+            for k, v in sig_page.items():
+                if k != "/Parent":
+                    _collect(v, keys)
+
+            mapping = {}
+            for key in keys:
+                mapping[key] = next_num
+                next_num += 1
+
+            page = DictionaryObject()
+            for k, v in sig_page.items():
+                if k != "/Parent":
+                    page[NameObject(k)] = _remap(v, mapping)
+            page[NameObject("/Parent")] = IndirectObject(
+                pages_ref.idnum, pages_ref.generation, None
+            )
+            # jangan warisi rotasi/crop dari Pages dokumen asli
+            if "/Rotate" in pages and "/Rotate" not in page:
+                page[NameObject("/Rotate")] = NumberObject(0)
+            if "/CropBox" in pages and "/CropBox" not in page:
+                page[NameObject("/CropBox")] = page["/MediaBox"]
+
+            objects = {keys[0]: page}
+            for key in keys[1:]:
+                source = sig_reader.get_object(IndirectObject(key[0], key[1], sig_reader))
+                objects[key] = _remap(source, mapping)
+
+            new_pages = DictionaryObject(pages)
+            new_pages[NameObject("/Kids")] = ArrayObject(
+                list(kids) + [IndirectObject(mapping[keys[0]], 0, None)]
+            )
+            new_pages[NameObject("/Count")] = NumberObject(int(pages["/Count"]) + 1)
+
+            body = [(pages_ref.idnum, pages_ref.generation,
+                     _serialize(pages_ref.idnum, pages_ref.generation, new_pages))]
+            for key, obj in objects.items():
+                body.append((mapping[key], 0, _serialize(mapping[key], 0, obj)))
+
+        trailer_entries = DictionaryObject()
+        for key in ("/Root", "/Info", "/ID"):
+            if key in trailer:
+                trailer_entries[NameObject(key)] = trailer.raw_get(key)
+
+    # salin byte asli verbatim (reflink jika bisa, kalau tidak sendfile)
+    clone_file(original_pdf, output_pdf)
+
+    with open(output_pdf, "ab") as out:
+        pos = size
+        if needs_newline:
+            out.write(b"\n")
+            pos += 1
+
+        offsets = {}
+        for num, gen, data in body:
+            offsets[num] = (pos, gen)
+            out.write(data)
+            pos += len(data)
+
+        if xref_is_stream:
+            out.write(_xref_stream(offsets, next_num, pos, prev_xref, trailer_entries))
+        else:
+            out.write(_xref_table(offsets, next_num, pos, prev_xref, trailer_entries))
+
+
+def _trailer_bytes(entries):
+    buf = BytesIO()
+    entries.write_to_stream(buf, None)
+    return buf.getvalue()
+
+
+def _xref_table(offsets, size, xref_at, prev_xref, trailer_entries):
+    out = bytearray(b"xref\n0 1\n0000000000 65535 f \n")
+    for start, group in _subsections(offsets):
+        out += b"%d %d\n" % (start, len(group))
+        for num in group:
+            off, gen = offsets[num]
+            out += b"%010d %05d n \n" % (off, gen)
+
+    trailer_entries[NameObject("/Size")] = NumberObject(size)
+    trailer_entries[NameObject("/Prev")] = NumberObject(prev_xref)
+    out += b"trailer\n" + _trailer_bytes(trailer_entries)
+    out += b"\nstartxref\n%d\n%%%%EOF\n" % xref_at
+    return bytes(out)
+
+
+def _xref_stream(offsets, size, xref_at, prev_xref, trailer_entries):
+    # dokumen asli memakai xref stream -> update juga pakai xref stream
+    xref_num = size
+    size += 1
+    offsets = dict(offsets)
+    offsets[xref_num] = (xref_at, 0)
+
+    off_width = max(4, (xref_at.bit_length() + 7) // 8)
+    data = bytearray(b"\x00" + bytes(off_width) + b"\xff\xff")
+    index = [0, 1]
+    for start, group in _subsections(offsets):
+        index += [start, len(group)]
+        for num in group:
+            off, gen = offsets[num]
+            data += b"\x01" + off.to_bytes(off_width, "big") + gen.to_bytes(2, "big")
+
+    trailer_entries[NameObject("/Type")] = NameObject("/XRef")
+    trailer_entries[NameObject("/Size")] = NumberObject(size)
+    trailer_entries[NameObject("/Prev")] = NumberObject(prev_xref)
+    trailer_entries[NameObject("/W")] = ArrayObject(
+        [NumberObject(1), NumberObject(off_width), NumberObject(2)]
+    )
+    trailer_entries[NameObject("/Index")] = ArrayObject([NumberObject(n) for n in index])
+    trailer_entries[NameObject("/Length")] = NumberObject(len(data))
+
+    return (b"%d 0 obj\n" % xref_num + _trailer_bytes(trailer_entries)
+            + b"\nstream\n" + bytes(data) + b"\nendstream\nendobj\n"
+            + b"startxref\n%d\n%%%%EOF\n" % xref_at)
@@ -0,0 +1,196 @@
+# Hash Merkle per chunk untuk dokumen besar (hash_algorithm "SHA-256-MERKLE").
+#
+# Dokumen dipecah menjadi chunk berukuran tetap; tiap chunk di-hash
+# paralel (hashlib melepas GIL, jadi thread memakai semua core) dan
+# root Merkle-nya yang ditandatangani. Hash daun disimpan di signature
+# JSON sehingga chunk yang berubah bisa dilaporkan sebagai rentang byte.
+#
+#   leaf = SHA-256(0x00 || chunk)
+#   node = SHA-256(0x01 || kiri || kanan)   (node ganjil naik apa adanya)
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+import base64, hashlib, os
+
+MERKLE_ALGORITHM = "SHA-256-MERKLE"
+MERKLE_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MiB per daun
+# batas chunk_size dari signature (tidak tepercaya): terlalu kecil ->
+# jutaan daun, 0/negatif -> loop tanpa akhir
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+MerkleTree = namedtuple("MerkleTree", "root leaves chunk_size size")
+
+
+def check_chunk_size(chunk_size):
+    """chunk_size harus int pangkat dua dalam [MIN_CHUNK_SIZE, MAX_CHUNK_SIZE];
+    selain itu ValueError."""
+    if (not isinstance(chunk_size, int) or isinstance(chunk_size, bool)
+            or not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE
+            or chunk_size & (chunk_size - 1)):
+        raise ValueError("chunk_size Merkle tidak valid: %r" % (chunk_size,))
+    return chunk_size
+
+
+def merkle_chunk_size(signature_json):
+    """chunk_size dari metadata "merkle" signature JSON (default
+    MERKLE_CHUNK_SIZE), sudah dicek. ValueError jika tidak valid."""
+    meta = signature_json.get("merkle")
+    if meta is None:
+        return MERKLE_CHUNK_SIZE
+    if not isinstance(meta, dict):
+        raise ValueError("Metadata Merkle tidak valid")
+    return check_chunk_size(meta.get("chunk_size", MERKLE_CHUNK_SIZE))
+
+
+def _leaf_hash(data):
+    h = hashlib.sha256(b"\x00")
+    h.update(data)
+    return h.digest()
+
+
+def merkle_root(leaves):
+    level = list(leaves)
+    while len(level) > 1:
+        nxt = []
+        for i in range(0, len(level) - 1, 2):
+            nxt.append(hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest())
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+def _workers(max_workers):
+    return max_workers or os.cpu_count() or 2
+
+
+def _leaves_from_path(path, chunk_size, max_workers):
+    size = os.path.getsize(path)
+    count = max(1, -(-size // chunk_size))
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        def hash_chunk(index):
+            # pread: tiap thread membaca offset-nya sendiri tanpa seek bersama
+            return _leaf_hash(os.pread(fd, chunk_size, index * chunk_size))
+
+        with ThreadPoolExecutor(max_workers=min(_workers(max_workers), count)) as pool:
+            leaves = list(pool.map(hash_chunk, range(count)))
+    finally:
+        os.close(fd)
+    return leaves, size
+
+
+def _leaves_from_stream(f, chunk_size, max_workers):
+    # file object dibaca berurutan; hashing tetap paralel dengan jumlah
+    # chunk di memori dibatasi 2x jumlah worker
+    workers = _workers(max_workers)
+    leaves, pending, size = [], [], 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk and size:
+                break
+            size += len(chunk)
+            pending.append(pool.submit(_leaf_hash, chunk))
+            if len(pending) >= workers * 2:
+                leaves.append(pending.pop(0).result())
+            if not chunk:
+                break
+        leaves.extend(p.result() for p in pending)
+    return leaves, size
+
+
+def merkle_tree(source, chunk_size=MERKLE_CHUNK_SIZE, max_workers=None):
+    """Bangun MerkleTree dari path, file object (binary) atau bytes."""
+    check_chunk_size(chunk_size)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        size = len(view)
+        count = max(1, -(-size // chunk_size))
+        chunks = [view[i * chunk_size:(i + 1) * chunk_size] for i in range(count)]
+        with ThreadPoolExecutor(max_workers=min(_workers(max_workers), count)) as pool:
+            leaves = list(pool.map(_leaf_hash, chunks))
+    elif isinstance(source, (str, os.PathLike)):
+        leaves, size = _leaves_from_path(source, chunk_size, max_workers)
+    else:
+        leaves, size = _leaves_from_stream(source, chunk_size, max_workers)
+    return MerkleTree(merkle_root(leaves), leaves, chunk_size, size)
+
+
+class MerkleHasher:
+    """Antarmuka ala hashlib (update/digest) untuk data yang datang
+    bertahap, mis. upload multipart. Daun di-hash begitu chunk penuh."""
+
+    name = MERKLE_ALGORITHM
+
+    def __init__(self, chunk_size=MERKLE_CHUNK_SIZE):
+        self.chunk_size = check_chunk_size(chunk_size)
+        self.size = 0
+        self.leaves = []
+        self._buffer = bytearray()
+
+    def update(self, data):
+        self.size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            self.leaves.append(_leaf_hash(memoryview(self._buffer)[:self.chunk_size]))
+            del self._buffer[:self.chunk_size]
+
+    def tree(self):
+        leaves = list(self.leaves)
+        if self._buffer or not leaves:
+            leaves.append(_leaf_hash(self._buffer))
+        return MerkleTree(merkle_root(leaves), leaves, self.chunk_size, self.size)
+
+    def digest(self):
+        return self.tree().root
+
+
+def tree_metadata(tree):
+    # disimpan di signature JSON sebagai "merkle"
+    return {
+        "chunk_size": tree.chunk_size,
+        "size": tree.size,
+        "leaves": [base64.b64encode(leaf).decode() for leaf in tree.leaves]
+    }
+
+
+def signed_leaves(signature_json):
+    """Daun dari signature JSON, hanya jika konsisten dengan root yang
+    ditandatangani (document_hash). Selain itu None."""
+    meta = signature_json.get("merkle")
+    if not meta or not isinstance(meta, dict):
+        return None
+    try:
+        leaves = [base64.b64decode(leaf) for leaf in meta["leaves"]]
+        root = base64.b64decode(signature_json["document_hash"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not leaves or merkle_root(leaves) != root:
+        return None
+    return leaves
+
+
+def modified_ranges(expected_leaves, tree, expected_size=None):
+    """Rentang byte (awal, akhir inklusif) yang berbeda, sudah digabung."""
+    chunk_size = tree.chunk_size
+    size = max(tree.size, expected_size or 0)
+    count = max(len(expected_leaves), len(tree.leaves))
+
+    ranges = []
+    for i in range(count):
+        a = expected_leaves[i] if i < len(expected_leaves) else None
+        b = tree.leaves[i] if i < len(tree.leaves) else None
+        if a == b:
+            continue
+        start = i * chunk_size
+        end = min((i + 1) * chunk_size, size) - 1
+        if ranges and ranges[-1][1] + 1 == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, max(start, end)))
+    return ranges
+
+
+def format_ranges(ranges):
+    return ", ".join("byte %d-%d" % r for r in ranges)
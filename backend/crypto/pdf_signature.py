@@ -1,32 +1,173 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from functools import lru_cache
+import zlib
 
-def create_signature_page(
-    output_path,
-    signer,
-    timestamp,
-    algorithm,
-    qr_path
-):
-    c = canvas.Canvas(output_path, pagesize=A4)
-    width, height = A4
+from crypto.qr import qr_matrix
+
+# Halaman tanda tangan dibangun dari template yang diserialisasi sekali
+# per proses (catalog, font, teks statis). Per dokumen hanya teks
+# dinamis (penandatangan, waktu, algoritma) dan QR yang ditulis.
+#
+# QR digambar langsung sebagai modul vektor dari matriks QR (tanpa
+# encode/decode PNG). qr_path (gambar) tetap didukung untuk kompatibilitas.
+
+# A4 dalam point, sama dengan reportlab.lib.pagesizes.A4 (reportlab
+# tidak perlu di-import hanya untuk konstanta ini)
+_MM = 72.0 / 2.54 * 0.1
+WIDTH, HEIGHT = 210 * _MM, 297 * _MM
+
+STATIC_LINES = [
+    ("F2", 16, 80, "DIGITAL SIGNATURE"),
+    ("F1", 11, 210, "Dokumen ini telah ditandatangani secara digital."),
+    ("F1", 11, 230, "Perubahan sekecil apapun akan membuat signature tidak valid."),
+]
+
+QR_X, QR_Y, QR_SIZE = 50, HEIGHT - 400, 120
 
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, height - 80, "DIGITAL SIGNATURE")
+_templates = {}
 
-    c.setFont("Helvetica", 11)
-    c.drawString(50, height - 120, f"Penandatangan : {signer}")
-    c.drawString(50, height - 145, f"Waktu         : {timestamp}")
-    c.drawString(50, height - 170, f"Algoritma     : {algorithm}")
 
-    c.drawString(50, height - 210,
-        "Dokumen ini telah ditandatangani secara digital."
+def _pdf_string(text):
+    # string literal PDF (WinAnsiEncoding)
+    data = text.encode("cp1252", errors="replace")
+    data = data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    return b"(" + data + b")"
+
+
+def _text_op(font, size, offset, text):
+    return b"BT /%s %d Tf %.2f %.2f Td %s Tj ET\n" % (
+        font.encode(), size, 50, HEIGHT - offset, _pdf_string(text)
     )
-    c.drawString(50, height - 230,
-        "Perubahan sekecil apapun akan membuat signature tidak valid."
+
+
+def _stream_obj(num, data, extra=b""):
+    return b"%d 0 obj\n<< /Length %d%s >>\nstream\n%s\nendstream\nendobj\n" % (
+        num, len(data), extra, data
     )
 
-    c.drawImage(qr_path, 50, height - 400, width=120, height=120)
 
-    c.showPage()
-    c.save()
+@lru_cache(maxsize=1024)
+def qr_vector_ops(data):
+    # satu operator "re" per deretan modul gelap yang bersebelahan
+    matrix = qr_matrix(data)
+    module = QR_SIZE / len(matrix)
+    ops = [b"q 0 g\n"]
+    for r, row in enumerate(matrix):
+        y = QR_Y + QR_SIZE - (r + 1) * module
+        c = 0
+        while c < len(row):
+            if not row[c]:
+                c += 1
+                continue
+            start = c
+            while c < len(row) and row[c]:
+                c += 1
+            ops.append(b"%.3f %.3f %.3f %.3f re\n" % (
+                QR_X + start * module, y, (c - start) * module, module
+            ))
+    ops.append(b"f Q\n")
+    return b"".join(ops)
+
+
+class SignaturePageTemplate:
+    """Objek PDF statis untuk halaman tanda tangan.
+
+    Nomor objek:
+      1 Catalog, 2 Pages, 3 Helvetica, 4 Helvetica-Bold,
+      5 konten statis, 6 Page, 7 konten dinamis, 8 gambar QR (opsional)
+    """
+
+    def __init__(self, with_image=False):
+        xobject = b" /XObject << /Im0 8 0 R >>" if with_image else b""
+        header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        static_objs = [
+            b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n",
+            b"2 0 obj\n<< /Type /Pages /Kids [6 0 R] /Count 1 >>\nendobj\n",
+            b"3 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica"
+            b" /Encoding /WinAnsiEncoding >>\nendobj\n",
+            b"4 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold"
+            b" /Encoding /WinAnsiEncoding >>\nendobj\n",
+            _stream_obj(5, b"".join(_text_op(*line) for line in STATIC_LINES)),
+            b"6 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.4f %.4f]"
+            b" /Resources << /Font << /F1 3 0 R /F2 4 0 R >>%s >>"
+            b" /Contents [5 0 R 7 0 R] >>\nendobj\n"
+            % (WIDTH, HEIGHT, xobject),
+        ]
+
+        self.prefix = header
+        self.offsets = []
+        for obj in static_objs:
+            self.offsets.append(len(self.prefix))
+            self.prefix += obj
+
+    def render(self, signer, timestamp, algorithm, qr_data=None, qr_image=None):
+        parts = [
+            _text_op("F1", 11, 120, f"Penandatangan : {signer}"),
+            _text_op("F1", 11, 145, f"Waktu         : {timestamp}"),
+            _text_op("F1", 11, 170, f"Algoritma     : {algorithm}"),
+        ]
+        objs = []
+
+        if qr_image is not None:
+            parts.append(b"q %d 0 0 %d %.2f %.2f cm /Im0 Do Q\n" % (QR_SIZE, QR_SIZE, QR_X, QR_Y))
+            width, height, bits, pixels = qr_image
+            objs.append(_stream_obj(
+                8, zlib.compress(pixels),
+                b" /Type /XObject /Subtype /Image /Width %d /Height %d"
+                b" /ColorSpace /DeviceGray /BitsPerComponent %d /Filter /FlateDecode"
+                % (width, height, bits)
+            ))
+        elif qr_data is not None:
+            parts.append(qr_vector_ops(qr_data))
+
+        content = zlib.compress(b"".join(parts))
+        objs.insert(0, _stream_obj(7, content, b" /Filter /FlateDecode"))
+
+        out = bytearray(self.prefix)
+        offsets = list(self.offsets)
+        for obj in objs:
+            offsets.append(len(out))
+            out += obj
+
+        xref_at = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+        for off in offsets:
+            out += b"%010d 00000 n \n" % off
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(offsets) + 1, xref_at
+        )
+        return bytes(out)
+
+
+def get_template(with_image=False):
+    if with_image not in _templates:
+        _templates[with_image] = SignaturePageTemplate(with_image)
+    return _templates[with_image]
+
+
+def load_qr_image(qr_path):
+    # PNG QR -> (width, height, bits, pixel bytes) untuk XObject PDF
+    from PIL import Image
+
+    with Image.open(qr_path) as img:
+        if img.mode == "1":
+            return img.width, img.height, 1, img.tobytes()
+        img = img.convert("L")
+        return img.width, img.height, 8, img.tobytes()
+
+
+def create_signature_page(
+    output_path,
+    signer,
+    timestamp,
+    algorithm,
+    qr_data=None,
+    qr_path=None
+):
+    if qr_path is not None:
+        data = get_template(with_image=True).render(
+            signer, timestamp, algorithm, qr_image=load_qr_image(qr_path)
+        )
+    else:
+        data = get_template().render(signer, timestamp, algorithm, qr_data=qr_data)
+    with open(output_path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,46 @@
+import json, os
+
+from crypto.sign import sign_document
+from crypto.qr import generate_qr
+from crypto.pdf_signature import create_signature_page
+from crypto.merge_pdf import merge_pdf
+from crypto.sidecar import HASH_ALGORITHM_IDS, encode_sidecar
+
+
+def sign_pipeline(file_path, doc_dir, signing_key, signer_name, qr_content, write_qr_png=False,
+                  write_sig_bin=False, hash_algorithm="SHA-256", certificate=None):
+    """Jalankan seluruh alur tanda tangan untuk satu dokumen.
+
+    hash -> sign -> .sig.json -> QR -> signature page -> SIGNED_*.pdf
+
+    Dipakai oleh /sign/batch di process pool, jadi semua argumen harus
+    bisa di-pickle (signing_key dikirim sebagai 32 byte seed).
+    """
+    filename = os.path.basename(file_path)
+
+    signature_data = sign_document(file_path, signing_key, signer_name=signer_name,
+                                   hash_algorithm=hash_algorithm, certificate=certificate)
+
+    with open(file_path + ".sig.json", "w") as f:
+        json.dump(signature_data, f, indent=2)
+
+    if write_sig_bin and signature_data["hash_algorithm"] in HASH_ALGORITHM_IDS:
+        with open(file_path + ".sig.bin", "wb") as f:
+            f.write(encode_sidecar(signature_data))
+
+    if write_qr_png:
+        generate_qr(qr_content, os.path.join(doc_dir, "qr.png"))
+
+    signature_page = os.path.join(doc_dir, "signature_page.pdf")
+    create_signature_page(
+        output_path=signature_page,
+        signer=signature_data["signer"]["name"],
+        timestamp=signature_data["timestamp"],
+        algorithm=signature_data["algorithm"],
+        qr_data=qr_content
+    )
+
+    final_pdf = os.path.join(doc_dir, "SIGNED_" + filename)
+    merge_pdf(file_path, signature_page, final_pdf)
+
+    return signature_data
@@ -1,5 +1,20 @@
-import qrcode
+from functools import lru_cache
+
+# qrcode (dan PIL yang ikut di-import) dimuat saat QR pertama dibuat
+
+
+@lru_cache(maxsize=1024)
+def qr_matrix(data):
+    # matriks modul QR (termasuk border), di-memoize per isi QR
+    import qrcode
+    qr = qrcode.QRCode(border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
 
 def generate_qr(data, output_path):
+    # tulis qr.png (opsional, halaman tanda tangan tidak membutuhkannya)
+    import qrcode
     qr = qrcode.make(data)
     qr.save(output_path)
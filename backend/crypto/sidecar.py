@@ -0,0 +1,201 @@
+# Sidecar signature biner (.sig.bin), alternatif ringkas untuk .sig.json.
+#
+# Format versi 1 (big-endian):
+#   magic      4 byte   b"DSIG"
+#   version    u8       1
+#   algorithm  u8       1 = Ed25519
+#   hash_alg   u8       1 = SHA-256, 2 = SHA-512, 3 = BLAKE2b, 4 = BLAKE3
+#   hash_len   u8       panjang digest (32 untuk SHA-256)
+#   hash       hash_len byte, digest mentah (bukan base64)
+#   signature  64 byte, signature Ed25519 mentah
+#   payload    u16 panjang + byte payload kanonik yang ditandatangani
+#   system     u8 panjang + string UTF-8 (signer.system)
+#
+# Payload disimpan persis seperti yang ditandatangani, jadi verifikasi
+# tidak perlu json.loads / json.dumps(sort_keys=True) sama sekali.
+#
+#   python -m crypto.sidecar to-bin  dokumen.pdf.sig.json
+#   python -m crypto.sidecar to-json dokumen.pdf.sig.bin
+import base64, json, struct, sys
+from collections import namedtuple
+
+from crypto.hashing import DEFAULT_HASH_ALGORITHM, HASH_ALGORITHMS, hash_document
+from crypto.keyring import as_verify_key
+from crypto.sign import signed_payload
+
+MAGIC = b"DSIG"
+VERSION = 1
+SIGNATURE_SIZE = 64
+
+ALGORITHMS = {"Ed25519": 1}
+HASH_ALGORITHM_IDS = {"SHA-256": 1, "SHA-512": 2, "BLAKE2b": 3, "BLAKE3": 4}
+_ALGORITHM_NAMES = {v: k for k, v in ALGORITHMS.items()}
+_HASH_ALGORITHM_NAMES = {v: k for k, v in HASH_ALGORITHM_IDS.items()}
+
+_HEADER = struct.Struct(">4sBBBB")
+
+BinarySignature = namedtuple(
+    "BinarySignature",
+    "algorithm hash_algorithm document_hash signature payload system"
+)
+
+
+class SidecarError(ValueError):
+    pass
+
+
+def is_binary_sidecar(data):
+    return bytes(data[:4]) == MAGIC
+
+
+def encode_sidecar(signature_json):
+    """signature JSON (dict) -> bytes .sig.bin"""
+    try:
+        algorithm = ALGORITHMS[signature_json["algorithm"]]
+        hash_algorithm = HASH_ALGORITHM_IDS[signature_json.get("hash_algorithm", "SHA-256")]
+    except KeyError as e:
+        raise SidecarError(f"Algoritma tidak didukung: {e}")
+
+    document_hash = base64.b64decode(signature_json["document_hash"])
+    signature = base64.b64decode(signature_json["signature"])
+    if len(signature) != SIGNATURE_SIZE:
+        raise SidecarError("Panjang signature tidak valid")
+
+    payload = signed_payload(
+        signature_json["document_hash"],
+        signature_json["timestamp"],
+        signature_json["signer"]["name"],
+        signature_json.get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+    )
+    system = signature_json["signer"].get("system", "").encode("utf-8")
+
+    return b"".join([
+        _HEADER.pack(MAGIC, VERSION, algorithm, hash_algorithm, len(document_hash)),
+        document_hash,
+        signature,
+        struct.pack(">H", len(payload)),
+        payload,
+        struct.pack(">B", len(system)),
+        system
+    ])
+
+
+def decode_sidecar(data):
+    """bytes .sig.bin -> BinarySignature (tanpa parsing JSON)"""
+    data = memoryview(data)
+    try:
+        magic, version, algorithm, hash_algorithm, hash_len = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise SidecarError("Bukan sidecar signature biner")
+        if version != VERSION:
+            raise SidecarError(f"Versi sidecar tidak didukung: {version}")
+
+        pos = _HEADER.size
+        document_hash = bytes(data[pos:pos + hash_len])
+        pos += hash_len
+        signature = bytes(data[pos:pos + SIGNATURE_SIZE])
+        pos += SIGNATURE_SIZE
+        (payload_len,) = struct.unpack_from(">H", data, pos)
+        pos += 2
+        payload = bytes(data[pos:pos + payload_len])
+        pos += payload_len
+        (system_len,) = struct.unpack_from(">B", data, pos)
+        pos += 1
+        system = bytes(data[pos:pos + system_len]).decode("utf-8")
+        pos += system_len
+    except struct.error:
+        raise SidecarError("Sidecar terpotong")
+
+    if pos != len(data) or len(document_hash) != hash_len or len(signature) != SIGNATURE_SIZE:
+        raise SidecarError("Sidecar terpotong")
+
+    return BinarySignature(
+        _ALGORITHM_NAMES.get(algorithm),
+        _HASH_ALGORITHM_NAMES.get(hash_algorithm),
+        document_hash,
+        signature,
+        payload,
+        system
+    )
+
+
+def to_json(sig):
+    """BinarySignature -> signature JSON (dict), format sama dengan sign_document"""
+    payload = json.loads(sig.payload)
+    return {
+        "algorithm": sig.algorithm,
+        "hash_algorithm": sig.hash_algorithm,
+        "document_hash": base64.b64encode(sig.document_hash).decode(),
+        "timestamp": payload["timestamp"],
+        "signature": base64.b64encode(sig.signature).decode(),
+        "signer": {
+            "name": payload["signer"],
+            "system": sig.system
+        }
+    }
+
+
+def verify_binary(file_path, sidecar, verify_key, document_hash=None):
+    """Padanan verify_document untuk sidecar biner.
+
+    sidecar boleh bytes atau BinarySignature. Mengembalikan (valid, message).
+    """
+    sig = decode_sidecar(sidecar) if not isinstance(sidecar, BinarySignature) else sidecar
+    if sig.algorithm != "Ed25519":
+        return False, "Signature TIDAK VALID"
+    if sig.hash_algorithm not in HASH_ALGORITHMS:
+        return False, f"Algoritma hash tidak didukung: {sig.hash_algorithm}"
+
+    current_hash = document_hash if document_hash is not None else \
+        hash_document(file_path, algorithm=sig.hash_algorithm)
+    if current_hash != sig.document_hash:
+        return False, "Dokumen telah diubah"
+
+    # payload kanonik selalu diawali document_hash lalu hash_algorithm (jika
+    # bukan default) dan signer (sort_keys), jadi cukup dicek prefix-nya
+    # supaya payload terikat ke hash dan algoritma di header
+    prefix = b'{"document_hash": "' + base64.b64encode(sig.document_hash) + b'", '
+    if sig.hash_algorithm != DEFAULT_HASH_ALGORITHM:
+        prefix += b'"hash_algorithm": "' + sig.hash_algorithm.encode() + b'", '
+    prefix += b'"signer": '
+    if not sig.payload.startswith(prefix):
+        return False, "Signature TIDAK VALID"
+
+    try:
+        as_verify_key(verify_key).verify(sig.payload, sig.signature)
+        return True, "Signature VALID"
+    except Exception:
+        return False, "Signature TIDAK VALID"
+
+
+def json_file_to_binary(json_path, bin_path=None):
+    if bin_path is None:
+        bin_path = json_path[:-len(".json")] + ".bin" if json_path.endswith(".json") else json_path + ".bin"
+    with open(json_path, "r") as f:
+        data = encode_sidecar(json.load(f))
+    with open(bin_path, "wb") as f:
+        f.write(data)
+    return bin_path
+
+
+def binary_file_to_json(bin_path, json_path=None):
+    if json_path is None:
+        json_path = bin_path[:-len(".bin")] + ".json" if bin_path.endswith(".bin") else bin_path + ".json"
+    with open(bin_path, "rb") as f:
+        signature_json = to_json(decode_sidecar(f.read()))
+    with open(json_path, "w") as f:
+        json.dump(signature_json, f, indent=2)
+    return json_path
+
+
+def main(argv):
+    if len(argv) not in (2, 3) or argv[0] not in ("to-bin", "to-json"):
+        print("Pemakaian: python -m crypto.sidecar to-bin|to-json <input> [output]")
+        return 1
+    convert = json_file_to_binary if argv[0] == "to-bin" else binary_file_to_json
+    print(convert(*argv[1:]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
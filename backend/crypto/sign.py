@@ -1,36 +1,63 @@
-from nacl.signing import SigningKey
-import hashlib, json, base64
+import json, base64
 from datetime import datetime, timezone, timedelta
 
+from crypto.hashing import DEFAULT_HASH_ALGORITHM, HASH_ALGORITHMS, UnsupportedHashAlgorithm, hash_document
+from crypto.merkle import MERKLE_ALGORITHM, MERKLE_CHUNK_SIZE, merkle_tree, tree_metadata
+from crypto.keyring import as_signing_key
+
 WIB = timezone(timedelta(hours=7))
-def sign_document(file_path, private_key_path, signer_name="Unknown"):
-    # baca dokumen
-    with open(file_path, "rb") as f:
-        data = f.read()
 
-    # hash dokumen
-    doc_hash = hashlib.sha256(data).digest()
+def signed_payload(document_hash_b64, timestamp, signer_name,
+                   hash_algorithm=DEFAULT_HASH_ALGORITHM, chunk_size=None):
+    # payload kanonik yang ditandatangani (dipakai juga oleh verify & sidecar).
+    # hash_algorithm selain default (dan chunk_size Merkle) ikut ditandatangani,
+    # supaya label algoritma di signature tidak bisa diganti; payload SHA-256
+    # tetap sama dengan format lama
+    payload = {
+        "document_hash": document_hash_b64,
+        "timestamp": timestamp,
+        "signer": signer_name
+    }
+    if hash_algorithm != DEFAULT_HASH_ALGORITHM:
+        payload["hash_algorithm"] = hash_algorithm
+    if chunk_size is not None:
+        payload["chunk_size"] = chunk_size
+    return json.dumps(payload, sort_keys=True).encode()
+
+def sign_document(file_path, signing_key, signer_name="Unknown", document_hash=None,
+                  hash_algorithm=DEFAULT_HASH_ALGORITHM, chunk_size=MERKLE_CHUNK_SIZE,
+                  certificate=None):
+    # hash dokumen (streaming, tanpa membaca seluruh file ke memori)
+    # file_path boleh berupa path, file object atau bytes;
+    # document_hash (digest mentah, algoritma sama dengan hash_algorithm)
+    # dipakai jika sudah dihitung saat upload
+    # hash_algorithm="SHA-256-MERKLE": chunk di-hash paralel, root yang
+    # ditandatangani, daun disimpan di "merkle" (document_hash diabaikan)
+    tree = None
+    if hash_algorithm == MERKLE_ALGORITHM:
+        tree = merkle_tree(file_path, chunk_size)
+        doc_hash = tree.root
+    elif hash_algorithm not in HASH_ALGORITHMS:
+        raise UnsupportedHashAlgorithm(hash_algorithm)
+    else:
+        doc_hash = document_hash if document_hash is not None else \
+            hash_document(file_path, algorithm=hash_algorithm)
     doc_hash_b64 = base64.b64encode(doc_hash).decode()
 
     # timestamp UTC
     timestamp = datetime.now(WIB).isoformat()
 
     # payload yang akan ditandatangani
-    payload = json.dumps({
-        "document_hash": doc_hash_b64,
-        "timestamp": timestamp,
-        "signer": signer_name
-    }, sort_keys=True).encode()
-
-    # sign
-    with open(private_key_path, "rb") as f:
-        signing_key = SigningKey(f.read())
+    payload = signed_payload(doc_hash_b64, timestamp, signer_name, hash_algorithm,
+                             tree.chunk_size if tree is not None else None)
 
+    # sign (signing_key boleh objek SigningKey atau path private key)
+    signing_key = as_signing_key(signing_key)
     signature = signing_key.sign(payload).signature
 
-    return {
+    signature_data = {
         "algorithm": "Ed25519",
-        "hash_algorithm": "SHA-256",
+        "hash_algorithm": hash_algorithm,
         "document_hash": doc_hash_b64,
         "timestamp": timestamp,
         "signature": base64.b64encode(signature).decode(),
@@ -39,3 +66,9 @@ def sign_document(file_path, private_key_path, signer_name="Unknown"):
             "system": "Digital Signature System v1"
         }
     }
+    if tree is not None:
+        signature_data["merkle"] = tree_metadata(tree)
+    # sertifikat penandatangan (crypto/certificate.py), diverifikasi terhadap CA
+    if certificate is not None:
+        signature_data["certificate"] = certificate
+    return signature_data
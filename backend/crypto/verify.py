@@ -1,29 +1,91 @@
-from nacl.signing import VerifyKey
-import hashlib, json, base64
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import base64, os
 
-def verify_document(file_path, signature_json, public_key_path):
-    # baca dokumen
-    with open(file_path, "rb") as f:
-        data = f.read()
+from crypto.hashing import HASH_ALGORITHMS, hash_document
+from crypto.keyring import as_verify_key
+from crypto.sign import signed_payload
+from crypto.sidecar import BinarySignature, verify_binary
+from crypto.merkle import (MERKLE_ALGORITHM, MerkleTree, merkle_tree, merkle_chunk_size,
+                           signed_leaves, modified_ranges, format_ranges)
 
-    # hash ulang dokumen
-    current_hash = hashlib.sha256(data).digest()
+def verify_document(file_path, signature_json, verify_key, document_hash=None, certificates=None):
+    """Mengembalikan (valid, message).
+
+    certificates (CertificateValidator, opsional): setelah signature
+    valid, sertifikat penandatangan di signature juga divalidasi.
+    """
+    result = _verify_document(file_path, signature_json, verify_key, document_hash)
+    if not result[0] or certificates is None:
+        return result
+    # sidecar biner tidak membawa sertifikat
+    ok, message = certificates.check(signature_json if isinstance(signature_json, dict) else {}, verify_key)
+    return result if ok else (False, message)
+
+
+def _verify_document(file_path, signature_json, verify_key, document_hash=None):
+    # sidecar biner (.sig.bin): payload sudah kanonik, tanpa JSON
+    if isinstance(signature_json, (bytes, bytearray, memoryview, BinarySignature)):
+        return verify_binary(file_path, signature_json, verify_key, document_hash)
+
+    # dispatch sesuai hash_algorithm yang tercatat di signature
+    hash_algorithm = signature_json.get("hash_algorithm", "SHA-256")
+    if hash_algorithm == MERKLE_ALGORITHM:
+        return _verify_merkle(file_path, signature_json, verify_key, document_hash)
+    if hash_algorithm not in HASH_ALGORITHMS:
+        return False, f"Algoritma hash tidak didukung: {hash_algorithm}"
+
+    # hash ulang dokumen (streaming), kecuali digest sudah dihitung saat upload
+    current_hash = document_hash if document_hash is not None else \
+        hash_document(file_path, algorithm=hash_algorithm)
     current_hash_b64 = base64.b64encode(current_hash).decode()
 
     # bandingkan hash
     if current_hash_b64 != signature_json["document_hash"]:
         return False, "Dokumen telah diubah"
 
-    # reconstruct payload
-    payload = json.dumps({
-        "document_hash": signature_json["document_hash"],
-        "timestamp": signature_json["timestamp"],
-        "signer": signature_json["signer"]["name"]
-    }, sort_keys=True).encode()
+    return _verify_payload(signature_json, verify_key, hash_algorithm)
+
+
+def _verify_merkle(file_path, signature_json, verify_key, document_hash=None):
+    # document_hash boleh MerkleTree (mis. dari MerkleHasher saat upload)
+    # atau root mentah; selain itu tree dibangun paralel dari dokumen
+    try:
+        chunk_size = merkle_chunk_size(signature_json)
+    except ValueError:
+        return False, "Metadata Merkle tidak valid"
+    if isinstance(document_hash, MerkleTree):
+        tree = document_hash
+    elif document_hash is not None:
+        tree = None
+    else:
+        tree = merkle_tree(file_path, chunk_size)
+    current_hash = tree.root if tree is not None else document_hash
+
+    if base64.b64encode(current_hash).decode() != signature_json["document_hash"]:
+        # daun yang konsisten dengan root bertanda tangan -> rentang yang diubah
+        leaves = signed_leaves(signature_json)
+        if tree is not None and leaves is not None and tree.chunk_size == chunk_size:
+            ranges = modified_ranges(leaves, tree, signature_json["merkle"].get("size"))
+            if ranges:
+                return False, "Dokumen telah diubah: " + format_ranges(ranges)
+        return False, "Dokumen telah diubah"
+
+    return _verify_payload(signature_json, verify_key, MERKLE_ALGORITHM, chunk_size)
+
 
-    # verify signature
-    with open(public_key_path, "rb") as f:
-        verify_key = VerifyKey(f.read())
+def _verify_payload(signature_json, verify_key, hash_algorithm, chunk_size=None):
+    # reconstruct payload (hash_algorithm/chunk_size yang dipakai untuk
+    # hashing ikut diverifikasi lewat payload)
+    payload = signed_payload(
+        signature_json["document_hash"],
+        signature_json["timestamp"],
+        signature_json["signer"]["name"],
+        hash_algorithm,
+        chunk_size
+    )
+
+    # verify signature (verify_key boleh objek VerifyKey atau path public key)
+    verify_key = as_verify_key(verify_key)
 
     try:
         verify_key.verify(
@@ -33,3 +95,33 @@ def verify_document(file_path, signature_json, public_key_path):
         return True, "Signature VALID"
     except:
         return False, "Signature TIDAK VALID"
+
+
+def verify_documents(items, verify_key, max_workers=None, certificates=None):
+    """Verifikasi banyak dokumen sekaligus.
+
+    items: iterable (dokumen, signature_json); dokumen boleh path,
+    file object atau bytes. Hash dihitung paralel di thread pool dan
+    satu VerifyKey dipakai untuk semua item.
+
+    Generator: menghasilkan (index, valid, message) begitu tiap item
+    selesai, tidak menunggu seluruh batch.
+    """
+    verify_key = as_verify_key(verify_key)
+    items = list(items)
+    if not items:
+        return
+
+    workers = max_workers or min(len(items), os.cpu_count() or 2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(verify_document, doc, sig, verify_key, certificates=certificates): index
+            for index, (doc, sig) in enumerate(items)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                valid, message = future.result()
+            except Exception as e:
+                valid, message = False, f"Signature tidak dapat diproses: {e}"
+            yield index, valid, message
@@ -0,0 +1,63 @@
+import json, os, time
+
+from crypto.certificate import CertificateError
+from crypto.verify import verify_document
+from crypto.sidecar import decode_sidecar, to_json
+from utils.lru import LRUCache
+
+
+def file_identity(path):
+    # berubah jika file diganti/ditulis ulang
+    st = os.stat(path)
+    return (path, st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+class VerificationCache(LRUCache):
+    """Cache LRU + TTL untuk hasil verifikasi dokumen di registry.
+
+    Key berisi identitas file dokumen asli dan .sig.json
+    (path, size, mtime_ns, inode) serta public key yang dipakai,
+    jadi perubahan file atau rotasi key otomatis membuat cache miss.
+    Hasil VALID bersertifikat paling lama hidup sampai not_after
+    sertifikat.
+    """
+
+
+def _result_ttl(cache, valid, signature_json, certificates):
+    cert = signature_json.get("certificate")
+    if not valid or certificates is None or cert is None:
+        return cache.ttl
+    try:
+        c = certificates.certificate(cert)
+    except CertificateError:
+        return cache.ttl
+    return min(cache.ttl, c.not_after.timestamp() - time.time())
+
+
+def verify_cached(cache, original_pdf, sig_path, verify_key, certificates=None):
+    """Verifikasi dokumen + sidecar (.sig.json atau .sig.bin), memakai
+    cache jika file tidak berubah.
+
+    Mengembalikan (valid, message, signature_json, cache_hit).
+    """
+    key = (file_identity(original_pdf), file_identity(sig_path), verify_key.encode())
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached + (True,)
+
+    if sig_path.endswith(".bin"):
+        # sidecar biner: verifikasi langsung dari payload kanonik
+        with open(sig_path, "rb") as f:
+            sig = decode_sidecar(f.read())
+        valid, message = verify_document(original_pdf, sig, verify_key, certificates=certificates)
+        signature_json = to_json(sig)
+    else:
+        with open(sig_path, "r") as f:
+            signature_json = json.load(f)
+        valid, message = verify_document(original_pdf, signature_json, verify_key, certificates=certificates)
+    result = (valid, message, signature_json)
+    ttl = _result_ttl(cache, valid, signature_json, certificates)
+    if ttl > 0:
+        cache.put(key, result, ttl=ttl)
+    return result + (False,)
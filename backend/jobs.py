@@ -0,0 +1,134 @@
+from sqlalchemy import and_, exists, or_, select, update
+from datetime import datetime
+import os, time
+
+from database import SessionLocal
+from models.signature import SignJob, VerificationRecord
+
+# Status job tanda tangan async (tabel sign_jobs, dibuat oleh init_registry)
+QUEUED, RUNNING, DONE, FAILED = "QUEUED", "RUNNING", "DONE", "FAILED"
+
+# Dengan beberapa worker uvicorn, job QUEUED/RUNNING dimiliki satu proses
+# (owner) selama lease-nya diperpanjang. Job yang lease-nya habis (proses
+# mati) diklaim proses lain dengan UPDATE bersyarat, jadi tidak pernah
+# dijalankan dua proses sekaligus.
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def create_job(job_id, owner, lease, **data):
+    now = _now()
+    with SessionLocal.begin() as session:
+        job = SignJob(job_id=job_id, status=QUEUED, stage="queued",
+                      created_at=now, updated_at=now, attempts=0,
+                      owner=owner, lease_until=time.time() + lease, **data)
+        session.add(job)
+    return job.to_dict()
+
+
+def get_job(job_id):
+    with SessionLocal() as session:
+        job = session.get(SignJob, job_id)
+        return job.to_dict() if job else None
+
+
+def update_job(job_id, **fields):
+    with SessionLocal.begin() as session:
+        job = session.get(SignJob, job_id)
+        for k, v in fields.items():
+            setattr(job, k, v)
+        job.updated_at = _now()
+        return job.to_dict()
+
+
+def start_attempt(job_id, owner):
+    # None jika job sudah tidak dimiliki owner (diklaim proses lain)
+    with SessionLocal.begin() as session:
+        job = session.get(SignJob, job_id)
+        if job is None or job.owner != owner or job.status not in (QUEUED, RUNNING):
+            return None
+        job.status = RUNNING
+        job.attempts += 1
+        job.error = None
+        job.updated_at = _now()
+        return job.to_dict()
+
+
+def find_active_by_hash(document_hash):
+    # job QUEUED/RUNNING untuk dokumen yang sama (retry klien -> job lama);
+    # job DONE hanya jika record-nya masih ada (belum di-expire GC)
+    record_exists = exists().where(VerificationRecord.verification_id == SignJob.verification_id)
+    with SessionLocal() as session:
+        job = session.scalars(
+            select(SignJob)
+            .where(
+                SignJob.document_hash == document_hash,
+                or_(SignJob.status.in_([QUEUED, RUNNING]), and_(SignJob.status == DONE, record_exists))
+            )
+            .order_by(SignJob.created_at.desc())
+            .limit(1)
+        ).first()
+        return job.to_dict() if job else None
+
+
+def claim_unfinished(owner, lease):
+    """Klaim job QUEUED/RUNNING tanpa owner atau yang lease-nya habis.
+
+    Mengembalikan [(job_id, attempts)] yang berhasil diklaim, urut waktu
+    dibuat. Klaim per job memakai UPDATE ... WHERE bersyarat, jadi satu
+    job hanya didapat satu proses.
+    """
+    now = time.time()
+    claimable = and_(
+        SignJob.status.in_([QUEUED, RUNNING]),
+        or_(SignJob.owner.is_(None), SignJob.lease_until.is_(None), SignJob.lease_until < now)
+    )
+    with SessionLocal() as session:
+        candidates = session.execute(
+            select(SignJob.job_id, SignJob.attempts).where(claimable).order_by(SignJob.created_at)
+        ).all()
+
+    claimed = []
+    for job_id, attempts in candidates:
+        with SessionLocal.begin() as session:
+            result = session.execute(
+                update(SignJob)
+                .where(SignJob.job_id == job_id, claimable)
+                .values(owner=owner, lease_until=now + lease, updated_at=_now())
+            )
+        if result.rowcount == 1:
+            claimed.append((job_id, attempts))
+    return claimed
+
+
+def renew_leases(owner, lease):
+    # heartbeat: perpanjang lease semua job aktif milik owner
+    with SessionLocal.begin() as session:
+        session.execute(
+            update(SignJob)
+            .where(SignJob.owner == owner, SignJob.status.in_([QUEUED, RUNNING]))
+            .values(lease_until=time.time() + lease)
+        )
+
+
+def release_jobs(owner):
+    # shutdown: job yang belum selesai langsung bisa diklaim proses lain
+    with SessionLocal.begin() as session:
+        session.execute(
+            update(SignJob)
+            .where(SignJob.owner == owner, SignJob.status.in_([QUEUED, RUNNING]))
+            .values(owner=None, lease_until=None)
+        )
+
+
+def active_doc_dir_names():
+    # folder job yang belum selesai tidak boleh dihapus GC
+    with SessionLocal() as session:
+        return {
+            os.path.basename(doc_dir)
+            for doc_dir in session.scalars(
+                select(SignJob.doc_dir).where(SignJob.status.in_([QUEUED, RUNNING]))
+            )
+        }
@@ -1,95 +1,508 @@
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Request, HTTPException
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
-import shutil, json, os, uuid
+import shutil, json, os, uuid, zipfile, asyncio, base64, hashlib, html, tempfile, importlib, contextlib, logging, socket
+from string import Template
+from typing import List
 from datetime import datetime
-import tempfile
 
 from crypto.sign import sign_document
-from crypto.verify import verify_document
+from crypto.verify import verify_document, verify_documents
 from crypto.qr import generate_qr
-from crypto.pdf_signature import create_signature_page
+from crypto.pdf_signature import create_signature_page, get_template
 from crypto.merge_pdf import merge_pdf
+from crypto.keyring import KeyRing
+from crypto.pipeline import sign_pipeline
+from crypto.verify_cache import VerificationCache, verify_cached, file_identity
+from crypto.hashing import HASH_ALGORITHMS, hash_document, new_hasher
+from crypto.sidecar import HASH_ALGORITHM_IDS, SidecarError, encode_sidecar, decode_sidecar, is_binary_sidecar, to_json
+from crypto.certificate import CertificateValidator
+from crypto.merkle import MERKLE_ALGORITHM, MerkleHasher, merkle_chunk_size, merkle_tree
 from utils.verification_id import generate_verification_id
+from utils.blobstore import BlobStore
+from utils.upload import StreamingUpload
+from utils.lru import LRUCache
+from utils.executor import IO_POOL, CPU_POOL, BATCH_POOL, ExecutorBusy, executor_stats, shutdown_executors
+from utils.metrics import METRICS, STAGE_LATENCY, UPLOAD_BYTES, MetricsMiddleware
+from utils.profiling import ProfilingMiddleware
+from utils.jobqueue import JobQueue
+from utils.auditlog import AuditLog
+from retention import GarbageCollector, doc_dir_path
+import registry, jobs, audit
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-UPLOAD_DIR = os.path.join(BASE_DIR, "../uploads")
-REGISTRY_PATH = os.path.join(BASE_DIR, "verification_registry.json")
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join(BASE_DIR, "../uploads"))
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+REGISTRY_PATH = os.environ.get("REGISTRY_PATH", os.path.join(BASE_DIR, "verification_registry.json"))
 PRIVATE_KEY = os.path.join(BASE_DIR, "../keys/private.key")
 PUBLIC_KEY = os.path.join(BASE_DIR, "../keys/public.key")
 
 SERVER_HOST = "http://192.168.2.134:8000"
 
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-if not os.path.exists(REGISTRY_PATH):
-    with open(REGISTRY_PATH, "w") as f:
-        json.dump({}, f)
+# qr.png hanya ditulis jika diminta (QR digambar langsung di halaman PDF)
+WRITE_QR_PNG = os.environ.get("WRITE_QR_PNG", "0") == "1"
+# Tulis juga sidecar biner ringkas (.sig.bin) di samping .sig.json
+WRITE_SIG_BIN = os.environ.get("WRITE_SIG_BIN", "0") == "1"
+# Algoritma hash default untuk tanda tangan baru: SHA-256, SHA-512, BLAKE2b,
+# BLAKE3 (jika paket blake3 terpasang) atau SHA-256-MERKLE (chunk paralel)
+SIGN_HASH_ALGORITHM = os.environ.get("SIGN_HASH_ALGORITHM", "SHA-256")
+if SIGN_HASH_ALGORITHM not in HASH_ALGORITHMS and SIGN_HASH_ALGORITHM != MERKLE_ALGORITHM:
+    raise RuntimeError(f"SIGN_HASH_ALGORITHM tidak didukung: {SIGN_HASH_ALGORITHM}")
+
+# Batas /sign/batch: jumlah PDF dan total byte (isi ZIP dihitung setelah
+# diekstrak, jadi zip bomb tidak bisa memenuhi disk upload)
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", 200))
+MAX_BATCH_BYTES = int(float(os.environ.get("MAX_BATCH_MB", 1024)) * 1024 * 1024)
+
+# Sertifikat penandatangan (crypto/certificate.py). SIGNER_CERTIFICATE:
+# *.cert.json yang disisipkan ke signature baru; CA_PUBLIC_KEY: public key
+# CA untuk memvalidasi sertifikat saat verifikasi; REQUIRE_CERTIFICATE=1
+# menolak signature tanpa sertifikat.
+SIGNER_CERTIFICATE_PATH = os.environ.get("SIGNER_CERTIFICATE")
+SIGNER_CERTIFICATE = None  # dimuat saat startup
+CA_PUBLIC_KEY = os.environ.get("CA_PUBLIC_KEY")
+REQUIRE_CERTIFICATE = os.environ.get("REQUIRE_CERTIFICATE", "0") == "1"
+if REQUIRE_CERTIFICATE and not CA_PUBLIC_KEY:
+    raise RuntimeError("REQUIRE_CERTIFICATE membutuhkan CA_PUBLIC_KEY")
+CERTIFICATES = CertificateValidator(
+    CA_PUBLIC_KEY,
+    require=REQUIRE_CERTIFICATE,
+    maxsize=int(os.environ.get("CERT_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("CERT_CACHE_TTL", 3600))
+) if CA_PUBLIC_KEY else None
+
+# /verify-public: template dikompilasi sekali, record & halaman di-cache.
+# Id yang tidak dikenal juga di-cache sebentar supaya scanner tidak
+# terus-menerus menembak database.
+with open(os.path.join(BASE_DIR, "templates", "verify_public.html"), encoding="utf-8") as f:
+    VERIFY_PUBLIC_TEMPLATE = Template(f.read())
+TEMPLATE_VERSION = hashlib.sha256(VERIFY_PUBLIC_TEMPLATE.template.encode()).hexdigest()[:8]
+PUBLIC_CACHE_CONTROL = "public, max-age=3600"
+RECORD_CACHE = LRUCache(maxsize=4096, ttl=3600)
+PUBLIC_PAGES = LRUCache(maxsize=1024, ttl=3600)
+MISSING_IDS = LRUCache(maxsize=10000, ttl=60)
+
+# ETag /download = SHA-256 isi SIGNED_*.pdf, di-cache per versi file
+SIGNED_ETAGS = LRUCache(maxsize=4096, ttl=86400)
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
+
+# Dokumen asli disimpan sekali per isi (SHA-256), dirujuk oleh registry
+BLOBS = BlobStore(BLOB_DIR)
+
+# Key dimuat sekali, reload otomatis jika file key berganti
+KEYRING = KeyRing(PRIVATE_KEY, PUBLIC_KEY)
+
+# Cache hasil verifikasi untuk /download dan /api/verify
+VERIFY_CACHE = VerificationCache(
+    maxsize=int(os.environ.get("VERIFY_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("VERIFY_CACHE_TTL", 300))
+)
+
+# Audit log append-only (JSONL) untuk event sign/verify/download/expire.
+# Event sign ditunggu sampai ter-fsync (group commit: request bersamaan
+# berbagi satu fsync); verify/download tidak menahan respons.
+# Registry bisa dibangun ulang: python -m audit replay <AUDIT_DIR>
+AUDIT_LOG = AuditLog(
+    os.environ.get("AUDIT_DIR", os.path.join(BASE_DIR, "../audit")),
+    max_segment_bytes=int(float(os.environ.get("AUDIT_SEGMENT_MB", 64)) * 1024 * 1024),
+    fsync=os.environ.get("AUDIT_FSYNC", "1") == "1"
+)
+
+def forget_record(verification_id):
+    # dipanggil GC (di thread executor) untuk record yang di-expire
+    RECORD_CACHE.discard(verification_id)
+    PUBLIC_PAGES.discard(verification_id)
+    AUDIT_LOG.append_threadsafe(audit.event("expire", verification_id=verification_id))
+
+# Retensi & GC folder upload (lihat retention.py): record lebih tua dari
+# RETENTION_DAYS (0 = selamanya), folder yatim, serta qr.png dan
+# signature_page.pdf dihapus bertahap. GC_INTERVAL=0 menonaktifkan GC.
+UPLOAD_GC = GarbageCollector(
+    UPLOAD_DIR,
+    BLOBS,
+    retention_days=float(os.environ.get("RETENTION_DAYS", 0)),
+    orphan_grace=float(os.environ.get("GC_ORPHAN_GRACE", 86400)),
+    intermediate_ttl=float(os.environ.get("GC_INTERMEDIATE_TTL", 3600)),
+    batch_size=int(os.environ.get("GC_BATCH_SIZE", 100)),
+    batch_delay=float(os.environ.get("GC_BATCH_DELAY", 1.0)),
+    on_expire=forget_record
+)
+GC_INTERVAL = float(os.environ.get("GC_INTERVAL", 3600))
+
+# PyPDF2, qrcode/PIL dan nacl (PyNaCl) dimuat lazy saat pertama dipakai.
+# WARM_IMPORTS=1 (default) memuatnya di startup supaya request pertama
+# tidak menanggung biayanya (dan worker proses hasil fork mewarisinya);
+# WARM_IMPORTS=0 untuk cold start secepat mungkin.
+WARM_IMPORTS = os.environ.get("WARM_IMPORTS", "1") == "1"
+LAZY_IMPORTS = ("nacl.signing", "qrcode", "PyPDF2", "PyPDF2.generic")
 
 app = FastAPI()
-app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
+# check_dir=False: direktori static baru dicek saat request pertama
+app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static"), check_dir=False), name="static")
+app.add_middleware(
+    MetricsMiddleware,
+    endpoints=["/sign", "/sign/batch", "/jobs", "/verify", "/verify/batch", "/verify-public", "/download", "/api/verify"]
+)
+
+# Profiling per request (opt-in): header "X-Profile: <PROFILE_TOKEN>"
+# atau sampling PROFILE_SAMPLE_RATE; hasil .prof di PROFILE_DIR/<request_id>/
+app.add_middleware(
+    ProfilingMiddleware,
+    directory=os.environ.get("PROFILE_DIR", os.path.join(BASE_DIR, "../profiles")),
+    token=os.environ.get("PROFILE_TOKEN"),
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0)),
+    max_concurrent=int(os.environ.get("PROFILE_MAX_CONCURRENT", 2))
+)
+
+# Jumlah record dihitung saat scrape (di IO_POOL, lihat /metrics), bukan per request
+REGISTRY_RECORDS = METRICS.gauge("signature_registry_records", "Jumlah dokumen di registry")
+GC_DELETED = METRICS.counter(
+    "signature_gc_deleted_total",
+    "Record/folder/file yang dihapus GC upload",
+    labels=("kind",)
+)
+
+@app.on_event("startup")
+def prepare_upload_dir():
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+@app.on_event("startup")
+def warm_imports():
+    if not WARM_IMPORTS:
+        return
+    for name in LAZY_IMPORTS:
+        importlib.import_module(name)
+    # template halaman tanda tangan juga dibangun sekali di sini
+    get_template()
+
+@app.on_event("startup")
+def load_keys():
+    KEYRING.load()
+
+@app.on_event("startup")
+def load_certificates():
+    global SIGNER_CERTIFICATE
+    if CERTIFICATES is not None:
+        CERTIFICATES.load()
+    if not SIGNER_CERTIFICATE_PATH:
+        return
+    with open(SIGNER_CERTIFICATE_PATH, "r") as f:
+        cert = json.load(f)
+    # sertifikat harus milik key server (dan, jika ada CA, ditandatangani CA)
+    try:
+        public_key = base64.b64decode(cert["public_key"], validate=True)
+    except (KeyError, TypeError, ValueError):
+        public_key = None
+    if public_key != KEYRING.verify_key().encode():
+        raise RuntimeError(f"Public key di {SIGNER_CERTIFICATE_PATH} tidak sesuai key server")
+    if CERTIFICATES is not None:
+        CERTIFICATES.certificate(cert)
+    SIGNER_CERTIFICATE = cert
+
+@app.on_event("startup")
+def load_registry():
+    # Registry di SQLite; JSON lama dimigrasi sekali saat startup
+    registry.init_registry(REGISTRY_PATH)
+
+@app.on_event("startup")
+def start_audit_log():
+    AUDIT_LOG.start()
+
+@app.on_event("startup")
+def start_sign_jobs():
+    # job async yang belum selesai (mis. terputus karena restart) diklaim
+    # lalu dilanjutkan; lease diperpanjang di background
+    global JOB_OWNER, JOB_LEASE_TASK
+    JOB_OWNER = "%s-%d-%s" % (socket.gethostname(), os.getpid(), uuid.uuid4().hex[:6])
+    SIGN_JOBS.start()
+    resume_sign_jobs(claim_sign_jobs())
+    JOB_LEASE_TASK = asyncio.get_running_loop().create_task(renew_job_leases())
+
+def claim_sign_jobs():
+    # jumlah percobaan diambil dari DB supaya job yang membuat proses crash
+    # tidak diulang tanpa batas lewat restart
+    resume = []
+    for job_id, attempts in jobs.claim_unfinished(JOB_OWNER, SIGN_JOB_LEASE):
+        if attempts >= SIGN_JOBS.max_attempts:
+            jobs.update_job(job_id, status=jobs.FAILED, error="Percobaan habis (terputus saat restart)")
+        else:
+            resume.append((job_id, attempts))
+    return resume
+
+def resume_sign_jobs(claimed):
+    for job_id, attempts in claimed:
+        SIGN_JOBS.submit(job_id, attempt=attempts + 1)
+
+async def renew_job_leases():
+    # heartbeat lease + ambil alih job milik proses yang sudah mati
+    while True:
+        await asyncio.sleep(SIGN_JOB_LEASE / 3)
+        try:
+            await IO_POOL.run(jobs.renew_leases, JOB_OWNER, SIGN_JOB_LEASE)
+            resume_sign_jobs(await IO_POOL.run(claim_sign_jobs))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Gagal memperpanjang lease job")
+
+@app.on_event("startup")
+def start_upload_gc():
+    if GC_INTERVAL > 0:
+        UPLOAD_GC.start(IO_POOL, GC_INTERVAL, on_step=count_gc_deleted)
+
+def count_gc_deleted(counts):
+    for kind, n in counts.items():
+        GC_DELETED.inc(kind, amount=n)
+
+@app.on_event("shutdown")
+async def stop_sign_jobs():
+    if JOB_LEASE_TASK is not None:
+        JOB_LEASE_TASK.cancel()
+        await asyncio.gather(JOB_LEASE_TASK, return_exceptions=True)
+    await SIGN_JOBS.stop()
+    # job yang terpotong langsung bisa diklaim worker lain
+    await IO_POOL.run(jobs.release_jobs, JOB_OWNER)
+
+@app.on_event("shutdown")
+async def stop_upload_gc():
+    await UPLOAD_GC.stop()
+
+@app.on_event("shutdown")
+async def stop_audit_log():
+    await AUDIT_LOG.stop()
+
+@app.on_event("shutdown")
+def stop_executors():
+    shutdown_executors()
+
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request: Request, exc: ExecutorBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"status": "BUSY", "message": "Server sedang sibuk, coba lagi"},
+        headers={"Retry-After": "5"}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    # format teks Prometheus; SELECT count(*) tidak dijalankan di event loop
+    REGISTRY_RECORDS.set(await IO_POOL.run(registry.count_records))
+    return Response(
+        content=METRICS.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@app.get("/executor/stats")
+async def get_executor_stats():
+    # queue depth & waktu tunggu pool, untuk sizing worker
+    return executor_stats()
 
 def create_unique_upload_dir():
     folder = datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + uuid.uuid4().hex[:6]
-    path = os.path.join(UPLOAD_DIR, folder)
+    path = doc_dir_path(UPLOAD_DIR, folder)
     os.makedirs(path, exist_ok=True)
     return path
 
-@app.post("/sign")
-async def sign(file: UploadFile = File(...)):
-    doc_dir = create_unique_upload_dir()
-
-    # Simpan PDF asli
-    file_path = os.path.join(doc_dir, file.filename)
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-
-    # Digital signature
+def lookup_record(verification_id):
+    # Record registry immutable -> aman di-cache di memori
+    d = RECORD_CACHE.get(verification_id)
+    if d is not None:
+        return d
+    if MISSING_IDS.get(verification_id):
+        return None
+
+    d = registry.get_record(verification_id)
+    if d is None:
+        MISSING_IDS.put(verification_id, True)
+    else:
+        RECORD_CACHE.put(verification_id, d)
+    return d
+
+def render_verify_public(verification_id, d):
+    # ETag dari isi record + versi template -> (etag, html)
+    fingerprint = json.dumps([verification_id, d, TEMPLATE_VERSION], sort_keys=True)
+    etag = '"' + hashlib.sha256(fingerprint.encode()).hexdigest()[:32] + '"'
+    page = VERIFY_PUBLIC_TEMPLATE.substitute(
+        filename=html.escape(d["filename"]),
+        signer=html.escape(d["signer"]),
+        timestamp=html.escape(d["timestamp"]),
+        algorithm=html.escape(d["algorithm"]),
+        download_url_js=json.dumps("/download/" + verification_id),
+        download_name_js=json.dumps("SIGNED_" + d["filename"]).replace("</", "<\\/")
+    )
+    return etag, page
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or "W/" + etag in candidates
+
+def signed_etag(path):
+    key = file_identity(path)
+    etag = SIGNED_ETAGS.get(key)
+    if etag is None:
+        etag = '"' + hash_document(path).hex() + '"'
+        SIGNED_ETAGS.put(key, etag)
+    return etag
+
+async def blob_key(signature_data, file_path):
+    # selain SHA-256, hash signature bukan key blob -> hitung SHA-256 terpisah
+    if signature_data["hash_algorithm"] == "SHA-256":
+        return document_digest(signature_data)
+    return (await IO_POOL.run(hash_document, file_path)).hex()
+
+def document_digest(signature_data):
+    # document_hash (base64 SHA-256) -> hex, dipakai sebagai key blob
+    return base64.b64decode(signature_data["document_hash"]).hex()
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def load_or_sign(file_path, document_hash):
+    # .sig.json yang sudah ada dipakai ulang (retry job tidak membuat
+    # timestamp/signature baru untuk dokumen yang sama)
+    sig_path = file_path + ".sig.json"
+    if os.path.exists(sig_path):
+        with open(sig_path, "r") as f:
+            return json.load(f)
     signature_data = sign_document(
         file_path,
-        PRIVATE_KEY,
-        signer_name="Roby Sunjaya"
+        KEYRING.signing_key(),
+        signer_name="Roby Sunjaya",
+        # digest upload selalu SHA-256, hanya dipakai jika algoritmanya sama
+        document_hash=document_hash if SIGN_HASH_ALGORITHM == "SHA-256" else None,
+        hash_algorithm=SIGN_HASH_ALGORITHM,
+        certificate=SIGNER_CERTIFICATE
     )
-
-    # Simpan signature JSON
-    with open(file_path + ".sig.json", "w") as f:
-        json.dump(signature_data, f, indent=2)
-
-    verification_id = generate_verification_id()
-
-    # Registry
-    with open(REGISTRY_PATH, "r") as f:
-        registry = json.load(f)
-
-    registry[verification_id] = {
-        "filename": file.filename,
-        "signed_filename": "SIGNED_" + file.filename,
+    write_json(sig_path, signature_data)
+    if WRITE_SIG_BIN and signature_data["hash_algorithm"] in HASH_ALGORITHM_IDS:
+        with open(file_path + ".sig.bin", "wb") as f:
+            f.write(encode_sidecar(signature_data))
+    return signature_data
+
+def store_original(verification_id, file_path, blob_hash, record):
+    # Dokumen asli ke blob store lalu record registry. Refcount blob hanya
+    # bertambah bersama record: jika record gagal ditulis, blob di-release
+    # lagi dan upload asli masih ada untuk percobaan berikutnya
+    if registry.get_record(verification_id) is None:
+        if os.path.exists(file_path):
+            BLOBS.put(file_path, blob_hash, move=False)
+            try:
+                registry.add_record(verification_id, **record)
+            except Exception:
+                BLOBS.release(blob_hash)
+                raise
+        elif BLOBS.exists(blob_hash):
+            # upload sudah dipindahkan ke blob store oleh percobaan sebelumnya
+            registry.add_record(verification_id, **record)
+        else:
+            raise FileNotFoundError(file_path)
+    # upload asli sudah ada di blob store (hardlink/copy)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(file_path)
+    return BLOBS.path(blob_hash)
+
+def registry_fields(filename, doc_dir, signature_data, blob_hash):
+    return {
+        "filename": filename,
+        "signed_filename": "SIGNED_" + filename,
         "doc_dir": doc_dir,
+        "document_hash": signature_data["document_hash"],
         "timestamp": signature_data["timestamp"],
         "signer": signature_data["signer"]["name"],
-        "algorithm": signature_data["algorithm"]
+        "algorithm": signature_data["algorithm"],
+        "blob_hash": blob_hash
     }
 
-    with open(REGISTRY_PATH, "w") as f:
-        json.dump(registry, f, indent=2)
+async def sign_stored_file(endpoint, doc_dir, filename, document_hash, verification_id, progress=None):
+    """Pipeline tanda tangan untuk dokumen yang sudah tersimpan di doc_dir.
+
+    Setiap tahap aman diulang (dipakai /sign dan job async yang di-retry
+    atau dilanjutkan setelah restart). progress(stage) dipanggil sebelum
+    tiap tahap.
+    """
+    async def stage(name):
+        if progress is not None:
+            await progress(name)
+        return STAGE_LATENCY.time(endpoint, name)
+
+    file_path = os.path.join(doc_dir, filename)
+
+    # Digital signature (hash sudah ada, dokumen tidak dibaca ulang)
+    with await stage("sign"):
+        signature_data = await IO_POOL.run(load_or_sign, file_path, document_hash)
+
+    # Pindahkan dokumen asli ke blob store (dedup per isi dokumen) bersama
+    # record registry; key blob selalu SHA-256 dari upload, apa pun
+    # hash_algorithm signature
+    blob_hash = document_hash.hex()
+    record = registry_fields(filename, doc_dir, signature_data, blob_hash)
+    with await stage("blob_store"):
+        original_pdf = await IO_POOL.run(store_original, verification_id, file_path, blob_hash, record)
+
+    # Audit log (respons baru dikirim setelah event ter-fsync)
+    with await stage("registry"):
+        await AUDIT_LOG.append(audit.event("sign", endpoint=endpoint, verification_id=verification_id, **record))
+    MISSING_IDS.discard(verification_id)
 
     # QR Code
     qr_content = f"{SERVER_HOST}/verify-public?id={verification_id}"
-    qr_path = os.path.join(doc_dir, "qr.png")
-    generate_qr(qr_content, qr_path)
+    if WRITE_QR_PNG:
+        with await stage("qr"):
+            await IO_POOL.run(generate_qr, qr_content, os.path.join(doc_dir, "qr.png"))
 
     # Signature page
     signature_page = os.path.join(doc_dir, "signature_page.pdf")
-    create_signature_page(
-        output_path=signature_page,
-        signer=signature_data["signer"]["name"],
-        timestamp=signature_data["timestamp"],
-        algorithm=signature_data["algorithm"],
-        qr_path=qr_path
-    )
+    with await stage("signature_page"):
+        await CPU_POOL.run(
+            create_signature_page,
+            output_path=signature_page,
+            signer=signature_data["signer"]["name"],
+            timestamp=signature_data["timestamp"],
+            algorithm=signature_data["algorithm"],
+            qr_data=qr_content
+        )
 
     # Final PDF
-    final_pdf = os.path.join(doc_dir, "SIGNED_" + file.filename)
-    merge_pdf(file_path, signature_page, final_pdf)
+    final_pdf = os.path.join(doc_dir, "SIGNED_" + filename)
+    with await stage("merge"):
+        await CPU_POOL.run(merge_pdf, original_pdf, signature_page, final_pdf)
+
+    return signature_data
+
+@app.post("/sign")
+async def sign(request: Request):
+    doc_dir = create_unique_upload_dir()
+
+    # Simpan PDF asli + hash dalam satu kali jalan selagi upload diterima;
+    # upload yang gagal / tidak valid tidak meninggalkan folder kosong
+    try:
+        with STAGE_LATENCY.time("/sign", "upload_hash"):
+            upload = await StreamingUpload(
+                {"file"},
+                destination=lambda field, filename: os.path.join(doc_dir, filename)
+            ).parse(request, executor=IO_POOL)
+
+        file = upload.files.get("file")
+        if file is None or not file.filename:
+            raise HTTPException(status_code=400, detail="File PDF wajib diisi")
+    except Exception:
+        shutil.rmtree(doc_dir, ignore_errors=True)
+        raise
+    UPLOAD_BYTES.inc("/sign", amount=file.size)
+
+    # ?async=1 -> 202 + job id, pipeline dijalankan SIGN_JOBS
+    if request.query_params.get("async") == "1":
+        return await submit_sign_job(doc_dir, file)
+
+    verification_id = generate_verification_id()
+    await sign_stored_file("/sign", doc_dir, file.filename, file.digest, verification_id)
 
     return {
         "status": "SIGNED",
@@ -97,145 +510,505 @@ async def sign(file: UploadFile = File(...)):
         "signed_pdf": "SIGNED_" + file.filename
     }
 
-@app.post("/verify")
-async def verify(
-    file: UploadFile = File(...),
-    signature: UploadFile = File(...)
-):
-    tmp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    try:
-        shutil.copyfileobj(file.file, tmp_pdf)
-        tmp_pdf.close()  
+def job_response(job):
+    d = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": SIGN_STAGES.index(job["stage"]) / (len(SIGN_STAGES) - 1)
+                    if job["stage"] in SIGN_STAGES else 0.0,
+        "attempts": job["attempts"],
+        "filename": job["filename"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "status_url": "/jobs/" + job["job_id"]
+    }
+    if job["status"] == jobs.DONE:
+        d["verification_id"] = job["verification_id"]
+        d["signed_pdf"] = "SIGNED_" + job["filename"]
+        d["download_url"] = "/download/" + job["verification_id"]
+    if job["status"] == jobs.FAILED:
+        d["error"] = job["error"]
+    return d
+
+async def submit_sign_job(doc_dir, file):
+    document_hash = file.digest.hex()
+
+    # Idempotent per hash dokumen: upload ulang (retry klien) dokumen yang
+    # sama mendapat job yang sudah ada, bukan tanda tangan baru
+    job = await IO_POOL.run(jobs.find_active_by_hash, document_hash)
+    if job is not None:
+        await IO_POOL.run(shutil.rmtree, doc_dir, True)
+    else:
+        job = await IO_POOL.run(
+            jobs.create_job,
+            uuid.uuid4().hex,
+            JOB_OWNER,
+            SIGN_JOB_LEASE,
+            document_hash=document_hash,
+            filename=file.filename,
+            doc_dir=doc_dir,
+            verification_id=generate_verification_id()
+        )
+        SIGN_JOBS.submit(job["job_id"])
+
+    return JSONResponse(
+        status_code=202,
+        content=job_response(job),
+        headers={"Location": "/jobs/" + job["job_id"]}
+    )
 
-        signature_bytes = await signature.read()
-        signature_json = json.loads(signature_bytes.decode("utf-8"))
+async def run_sign_job(job_id):
+    job = await IO_POOL.run(jobs.start_attempt, job_id, JOB_OWNER)
+    if job is None:
+        return  # sudah diklaim worker lain
 
-        valid, message = verify_document(
-            tmp_pdf.name,
-            signature_json,
-            PUBLIC_KEY
+    async def progress(stage):
+        await IO_POOL.run(jobs.update_job, job_id, stage=stage)
+
+    try:
+        await sign_stored_file(
+            "/sign/async",
+            job["doc_dir"],
+            job["filename"],
+            bytes.fromhex(job["document_hash"]),
+            job["verification_id"],
+            progress=progress
         )
+    except Exception as exc:
+        # masih ada percobaan lagi -> kembali ke antrean
+        await IO_POOL.run(jobs.update_job, job_id, status=jobs.QUEUED, error=repr(exc))
+        raise
+    await IO_POOL.run(jobs.update_job, job_id, status=jobs.DONE, stage="done")
+
+async def fail_sign_job(job_id, exc):
+    await IO_POOL.run(jobs.update_job, job_id, status=jobs.FAILED, error=repr(exc))
+
+SIGN_STAGES = ["queued", "sign", "blob_store", "registry", "qr", "signature_page", "merge", "done"]
+SIGN_JOBS = JobQueue(
+    run_sign_job,
+    fail_sign_job,
+    workers=int(os.environ.get("SIGN_JOB_WORKERS", 2)),
+    max_attempts=int(os.environ.get("SIGN_JOB_MAX_ATTEMPTS", 3)),
+    retry_delay=float(os.environ.get("SIGN_JOB_RETRY_DELAY", 2.0))
+)
+# Lease job (detik) antar worker uvicorn; owner diisi saat startup
+SIGN_JOB_LEASE = float(os.environ.get("SIGN_JOB_LEASE", 60))
+JOB_OWNER = None
+JOB_LEASE_TASK = None
+
+@app.get("/jobs/{job_id}")
+async def get_sign_job(job_id: str):
+    job = await IO_POOL.run(jobs.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return job_response(job)
+
+def copy_limited(src, path, budget):
+    # salin src ke path sambil mengurangi budget["bytes"]; 413 jika habis
+    with open(path, "wb") as f:
+        while True:
+            chunk = src.read(1024 * 1024)
+            if not chunk:
+                break
+            budget["bytes"] -= len(chunk)
+            if budget["bytes"] < 0:
+                raise HTTPException(status_code=413, detail="Ukuran batch melebihi batas")
+            f.write(chunk)
+
+def collect_batch_files(files, batch_dir):
+    # Simpan upload ke batch_dir; file .zip diekstrak (hanya PDF), dibatasi
+    # MAX_BATCH_FILES dan MAX_BATCH_BYTES
+    inputs = []
+    budget = {"bytes": MAX_BATCH_BYTES}
+
+    def next_path(entry):
+        if len(inputs) >= MAX_BATCH_FILES:
+            raise HTTPException(status_code=413, detail=f"Maksimal {MAX_BATCH_FILES} file per batch")
+        return os.path.join(batch_dir, "in_%d_%s" % (len(inputs), entry))
+
+    for upload in files:
+        name = os.path.basename(upload.filename or "")
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(upload.file) as zf:
+                for info in zf.infolist():
+                    entry = os.path.basename(info.filename)
+                    if info.is_dir() or not entry.lower().endswith(".pdf"):
+                        continue
+                    path = next_path(entry)
+                    with zf.open(info) as src:
+                        copy_limited(src, path, budget)
+                    inputs.append((entry, path))
+        elif name:
+            path = next_path(name)
+            copy_limited(upload.file, path, budget)
+            inputs.append((name, path))
+    return inputs
+
+def prepare_batch_item(filename, src_path):
+    doc_dir = create_unique_upload_dir()
+    file_path = os.path.join(doc_dir, filename)
+    os.replace(src_path, file_path)
+    return doc_dir, file_path
+
+def write_batch_zip(zip_path, manifest, results):
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+        for item in results:
+            prefix = item["verification_id"] + "/"
+            zf.write(item["signed_path"], prefix + "SIGNED_" + item["filename"],
+                     compress_type=zipfile.ZIP_STORED)
+            zf.write(item["file_path"] + ".sig.json", prefix + item["filename"] + ".sig.json")
+            if os.path.exists(item["file_path"] + ".sig.bin"):
+                zf.write(item["file_path"] + ".sig.bin", prefix + item["filename"] + ".sig.bin",
+                         compress_type=zipfile.ZIP_STORED)
+
+def commit_batch(results, records):
+    # dokumen asli ke blob store, lalu record registry (satu transaksi)
+    stored = []
+    try:
+        for item in results:
+            BLOBS.put(item["file_path"], item["blob_hash"])
+            stored.append(item["blob_hash"])
+        registry.add_records(records)
+    except Exception:
+        for blob_hash in stored:
+            BLOBS.release(blob_hash)
+        raise
+
+@app.post("/sign/batch")
+async def sign_batch(files: List[UploadFile] = File(...)):
+    batch_id = "batch_" + datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + uuid.uuid4().hex[:6]
+    batch_dir = os.path.join(UPLOAD_DIR, batch_id)
+    os.makedirs(batch_dir, exist_ok=True)
 
+    try:
+        with STAGE_LATENCY.time("/sign/batch", "upload"):
+            inputs = await IO_POOL.run(collect_batch_files, files, batch_dir)
+        if not inputs:
+            raise HTTPException(status_code=400, detail="Tidak ada file PDF")
+    except zipfile.BadZipFile:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail="File ZIP tidak valid")
+    except HTTPException:
+        # file yang sudah diekstrak dibuang, tidak menunggu GC
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise
+    UPLOAD_BYTES.inc("/sign/batch", amount=sum(os.path.getsize(path) for _, path in inputs))
+
+    # seed 32 byte, supaya bisa dikirim ke process pool
+    signing_seed = KEYRING.signing_key().encode()
+    slots = asyncio.Semaphore(BATCH_POOL.max_workers)
+
+    async def sign_one(filename, src_path):
+        # dokumen yang gagal tidak menggagalkan batch: dicatat di manifest
+        # ("failed") dan folder-nya dibuang
+        doc_dir = None
+        try:
+            async with slots:
+                doc_dir, file_path = await IO_POOL.run(prepare_batch_item, filename, src_path)
+                verification_id = generate_verification_id()
+                with STAGE_LATENCY.time("/sign/batch", "pipeline"):
+                    signature_data = await BATCH_POOL.run(
+                        sign_pipeline,
+                        file_path,
+                        doc_dir,
+                        signing_seed,
+                        "Roby Sunjaya",
+                        f"{SERVER_HOST}/verify-public?id={verification_id}",
+                        WRITE_QR_PNG,
+                        WRITE_SIG_BIN,
+                        SIGN_HASH_ALGORITHM,
+                        SIGNER_CERTIFICATE
+                    )
+                blob_hash = await blob_key(signature_data, file_path)
+        except Exception as exc:
+            if doc_dir is not None:
+                await IO_POOL.run(shutil.rmtree, doc_dir, True)
+            return {"filename": filename, "error": repr(exc)}
         return {
+            "verification_id": verification_id,
+            "filename": filename,
+            "doc_dir": doc_dir,
+            "file_path": file_path,
+            "signed_path": os.path.join(doc_dir, "SIGNED_" + filename),
+            "blob_hash": blob_hash,
+            "signature": signature_data
+        }
+
+    items = await asyncio.gather(*(sign_one(n, p) for n, p in inputs))
+    results = [item for item in items if "error" not in item]
+    failed = [item for item in items if "error" in item]
+
+    manifest = {
+        "batch_id": batch_id,
+        "count": len(results),
+        "documents": [
+            {
+                "verification_id": item["verification_id"],
+                "filename": item["filename"],
+                "signed_pdf": "SIGNED_" + item["filename"],
+                "document_hash": item["signature"]["document_hash"],
+                "timestamp": item["signature"]["timestamp"]
+            }
+            for item in results
+        ],
+        "failed": [{"filename": item["filename"], "error": item["error"]} for item in failed]
+    }
+
+    # ZIP dibuat sebelum commit: setelah record ter-commit tidak ada lagi
+    # langkah yang bisa gagal dan membuat klien menerima error
+    zip_path = os.path.join(batch_dir, batch_id + ".zip")
+    await IO_POOL.run(write_batch_zip, zip_path, manifest, results)
+
+    # Blob store + semua baris registry dalam satu task IO_POOL (tidak
+    # membanjiri antrean executor); gagal -> refcount dikembalikan
+    records = [
+        (item["verification_id"],
+         registry_fields(item["filename"], item["doc_dir"], item["signature"], item["blob_hash"]))
+        for item in results
+    ]
+    with STAGE_LATENCY.time("/sign/batch", "registry"):
+        await IO_POOL.run(commit_batch, results, records)
+    for item in results:
+        MISSING_IDS.discard(item["verification_id"])
+
+    # event audit satu fsync; record sudah ter-commit, jadi kegagalan
+    # audit log (sudah di-log writer-nya) tidak mengubah respons
+    await asyncio.gather(*(
+        AUDIT_LOG.append(audit.event("sign", endpoint="/sign/batch", verification_id=verification_id, **record))
+        for verification_id, record in records
+    ), return_exceptions=True)
+
+    return FileResponse(
+        zip_path,
+        filename=batch_id + ".zip",
+        media_type="application/zip",
+        headers={"X-Batch-Id": batch_id, "X-Batch-Failed": str(len(failed))}
+    )
+
+# field signature JSON yang wajib ada (string)
+SIGNATURE_FIELDS = ("document_hash", "timestamp", "signature")
+
+def check_signature_json(signature_json):
+    # ValueError jika signature JSON tidak lengkap / tipenya salah
+    if not isinstance(signature_json, dict):
+        raise ValueError("Signature harus berupa objek JSON")
+    for key in SIGNATURE_FIELDS:
+        if not isinstance(signature_json.get(key), str):
+            raise ValueError(f"Field signature tidak valid: {key}")
+    signer = signature_json.get("signer")
+    if not isinstance(signer, dict) or not isinstance(signer.get("name"), str):
+        raise ValueError("Field signature tidak valid: signer.name")
+    if not isinstance(signature_json.get("hash_algorithm", ""), str):
+        raise ValueError("Field signature tidak valid: hash_algorithm")
+    if signature_json.get("hash_algorithm") == MERKLE_ALGORITHM:
+        merkle_chunk_size(signature_json)
+
+def parse_signature(raw):
+    # .sig.bin -> (BinarySignature, dict untuk respons); .sig.json -> (dict, dict)
+    # Signature rusak -> SidecarError / ValueError (400 di /verify)
+    if is_binary_sidecar(raw):
+        signature = decode_sidecar(raw)
+        return signature, to_json(signature)
+    signature_json = json.loads(raw.decode("utf-8"))
+    check_signature_json(signature_json)
+    return signature_json, signature_json
+
+def signature_hash_algorithm(signature):
+    # hash_algorithm dari signature JSON (dict) atau BinarySignature
+    if isinstance(signature, dict):
+        return signature.get("hash_algorithm", "SHA-256")
+    return signature.hash_algorithm
+
+def verify_hasher(upload, state):
+    # dipanggil saat part "file" mulai: jika signature sudah diterima
+    # (dikirim lebih dulu), langsung hash dengan algoritmanya
+    state["algorithm"] = "SHA-256"
+    raw = upload.fields.get("signature")
+    if raw is not None:
+        try:
+            signature, _ = parse_signature(raw)
+        except (SidecarError, ValueError, KeyError, TypeError):
+            return hashlib.sha256()
+        algorithm = signature_hash_algorithm(signature)
+        if algorithm == MERKLE_ALGORITHM:
+            state["algorithm"] = algorithm
+            return MerkleHasher(merkle_chunk_size(signature))
+        if algorithm in HASH_ALGORITHMS:
+            state["algorithm"] = algorithm
+            return new_hasher(algorithm)
+    return hashlib.sha256()
+
+def uploaded_document_hash(file, signature, state):
+    # digest untuk verify_document sesuai hash_algorithm signature
+    algorithm = signature_hash_algorithm(signature)
+    if algorithm == state.get("algorithm"):
+        return file.hasher.tree() if isinstance(file.hasher, MerkleHasher) else file.digest
+    if algorithm != MERKLE_ALGORITHM and algorithm not in HASH_ALGORITHMS:
+        return None  # verify_document melaporkan algoritma tidak didukung
+    if "path" not in state:
+        raise HTTPException(status_code=400, detail="File signature tidak valid")
+    # signature datang setelah file: hash ulang salinan sementara
+    if algorithm == MERKLE_ALGORITHM:
+        return merkle_tree(state["path"], merkle_chunk_size(signature))
+    return hash_document(state["path"], algorithm=algorithm)
+
+@app.post("/verify")
+async def verify(request: Request):
+    # Dokumen di-hash selagi diterima. Jika signature dikirim lebih dulu,
+    # dokumen tidak pernah ditulis ke disk; jika tidak, dokumen disimpan
+    # sementara untuk berjaga-jaga signature memakai hash_algorithm lain.
+    state = {}
+
+    def destination(field, filename):
+        if "signature" in upload.fields:
+            return None
+        fd, state["path"] = tempfile.mkstemp(prefix="verify_", suffix=".pdf")
+        os.close(fd)
+        return state["path"]
+
+    upload = StreamingUpload({"file"}, destination=destination,
+                             new_hasher=lambda: verify_hasher(upload, state))
+    try:
+        with STAGE_LATENCY.time("/verify", "upload_hash"):
+            await upload.parse(request, executor=IO_POOL)
+
+        file = upload.files.get("file")
+        if file is None or "signature" not in upload.fields:
+            raise HTTPException(status_code=400, detail="File dan signature wajib diisi")
+        UPLOAD_BYTES.inc("/verify", amount=file.size)
+
+        try:
+            signature, signature_json = parse_signature(upload.fields["signature"])
+        except (SidecarError, ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="File signature tidak valid")
+
+        document_hash = await IO_POOL.run(uploaded_document_hash, file, signature, state)
+
+        with STAGE_LATENCY.time("/verify", "verify"):
+            valid, message = verify_document(
+                None,
+                signature,
+                KEYRING.verify_key(),
+                document_hash=document_hash,
+                certificates=CERTIFICATES
+            )
+    finally:
+        # langsung, bukan lewat IO_POOL: antrean penuh (ExecutorBusy) tidak
+        # boleh membuat file sementara bocor atau menutupi hasil verifikasi
+        if "path" in state:
+            with contextlib.suppress(OSError):
+                os.remove(state["path"])
+
+    AUDIT_LOG.append(audit.event(
+        "verify",
+        endpoint="/verify",
+        filename=file.filename,
+        valid=valid,
+        message=message,
+        document_hash=signature_json["document_hash"],
+        signer=signature_json["signer"]["name"],
+        timestamp=signature_json["timestamp"]
+    ), wait=False)
+
+    return {
+        "valid": valid,
+        "message": message,
+        "timestamp": signature_json["timestamp"],
+        "signer": signature_json["signer"]["name"],
+        "algorithm": signature_json.get("algorithm")
+    }
+
+def pair_batch_signatures(files, signatures):
+    # Pasangkan dokumen dengan <nama>.sig.json; jika tidak ada, pakai urutan
+    by_name = {os.path.basename(s.filename or ""): s for s in signatures}
+    pairs = []
+    for index, doc in enumerate(files):
+        name = os.path.basename(doc.filename or "")
+        sig = by_name.get(name + ".sig.json") or by_name.get(name + ".sig.bin")
+        if sig is None and index < len(signatures):
+            sig = signatures[index]
+        pairs.append((doc, sig))
+    return pairs
+
+def iter_verify_batch(pairs, verify_key):
+    items, shown, errors = [], [], {}
+    for index, (doc, sig) in enumerate(pairs):
+        try:
+            signature, signature_json = parse_signature(sig.file.read())
+        except Exception:
+            signature = signature_json = None
+            errors[index] = "File signature tidak ditemukan atau tidak valid"
+        items.append((doc.file, signature))
+        shown.append(signature_json)
+
+    for index, message in errors.items():
+        AUDIT_LOG.append_threadsafe(audit.event(
+            "verify", endpoint="/verify/batch", filename=pairs[index][0].filename,
+            valid=False, message=message
+        ))
+        yield json.dumps({
+            "index": index,
+            "filename": pairs[index][0].filename,
+            "valid": False,
+            "message": message
+        }) + "\n"
+
+    valid_items = [(i, item) for i, item in enumerate(items) if i not in errors]
+    results = verify_documents([item for _, item in valid_items], verify_key, certificates=CERTIFICATES)
+    for pos, valid, message in results:
+        index = valid_items[pos][0]
+        signature_json = shown[index]
+        AUDIT_LOG.append_threadsafe(audit.event(
+            "verify", endpoint="/verify/batch", filename=pairs[index][0].filename,
+            valid=valid, message=message, document_hash=signature_json["document_hash"],
+            signer=signature_json["signer"]["name"], timestamp=signature_json["timestamp"]
+        ))
+        yield json.dumps({
+            "index": index,
+            "filename": pairs[index][0].filename,
             "valid": valid,
             "message": message,
             "timestamp": signature_json["timestamp"],
             "signer": signature_json["signer"]["name"],
-            "algorithm": signature_json["algorithm"]
-        }
+            "algorithm": signature_json.get("algorithm")
+        }) + "\n"
 
-    finally:
-        # HAPUS FILE TEMP (CLEAN & AMAN)
-        if os.path.exists(tmp_pdf.name):
-            os.remove(tmp_pdf.name)
+@app.post("/verify/batch")
+async def verify_batch(
+    files: List[UploadFile] = File(...),
+    signatures: List[UploadFile] = File(...)
+):
+    # Hasil dikirim per baris (NDJSON) begitu tiap dokumen selesai
+    pairs = pair_batch_signatures(files, signatures)
+    UPLOAD_BYTES.inc("/verify/batch", amount=sum(f.size or 0 for f in files))
+    return StreamingResponse(
+        iter_verify_batch(pairs, KEYRING.verify_key()),
+        media_type="application/x-ndjson"
+    )
 
 @app.get("/verify-public", response_class=HTMLResponse)
-async def verify_public(id: str):
-    with open(REGISTRY_PATH, "r") as f:
-        registry = json.load(f)
+async def verify_public(request: Request, id: str):
+    d = lookup_record(id)
 
-    if id not in registry:
-        return "<h2>❌ Data verifikasi tidak ditemukan</h2>"
-
-    d = registry[id]
-
-    return f"""
-<!DOCTYPE html>
-<html>
-<head>
-<meta name="viewport" content="width=device-width, initial-scale=1">
-<title>Verifikasi Dokumen</title>
-<style>
-body {{
- background: linear-gradient(rgba(0,0,0,.45),rgba(0,0,0,.45)),
- url('/static/bgon.jpg') center/cover fixed;
- font-family: Arial;
-}}
-.card {{
- max-width:480px; margin:40px auto; background:rgba(255,255,255,.8);
- padding:30px; border-radius:12px;
- box-shadow:0 10px 25px rgba(0,0,0,.15);
-}}
-.badge {{ background:#e8f5e9; color:#2e7d32; padding:6px 14px; border-radius:20px; }}
-.badge.valid {{
-    background: #e8f5e9;
-    color: #2e7d32;
-    font-weight: bold;
-}}
-.download {{
-    display:block;
-    width:100%;
-    margin:20px auto 0;
-    padding:12px;
-    background:#2563eb;
-    color:white;
-    border:none;
-    border-radius:8px;
-    font-size:16px;
-    font-weight:600;
-    cursor:pointer;
-    text-align:center;
-}}
-</style>
-</head>
-<body>
-<div class="card">
-<h2 id="docTitle">🔍 Informasi Dokumen</h2>
-<span class="badge" id="docStatus">Belum Diverifikasi</span>
-<p><b>File:</b> {d['filename']}</p>
-<p><b>Penandatangan:</b> {d['signer']}</p>
-<p><b>Waktu:</b> {d['timestamp']}</p>
-<p><b>Algoritma:</b> {d['algorithm']}</p>
-
-<button class="download" onclick="downloadDoc()">⬇ Download Dokumen</button>
-<div id="downloadStatus" style="
-    display:none; 
-    margin-top:15px; 
-    padding:12px; 
-    border-radius:8px; 
-    font-size:14px; 
-    background:#ffebee; 
-    color:#c62828;">
-</div>
+    if d is None:
+        return HTMLResponse(
+            "<h2>❌ Data verifikasi tidak ditemukan</h2>",
+            headers={"Cache-Control": f"public, max-age={int(MISSING_IDS.ttl)}"}
+        )
 
-<script>
-async function downloadDoc() {{
-    const statusBox = document.getElementById("downloadStatus");
-    statusBox.style.display = "none";
-
-    const res = await fetch("/download/{id}");
-
-    if (!res.ok) {{
-        const data = await res.json();
-        statusBox.innerText = "❌ " + (data.message || "Dokumen tidak valid atau sudah berubah");
-        statusBox.style.display = "block";
-        return;
-    }}
-
-    const blob = await res.blob();
-    const url = window.URL.createObjectURL(blob);
-
-    document.getElementById("docTitle").innerText = "✔️ Dokumen Terverifikasi";
-    const statusBadge = document.getElementById("docStatus");
-    statusBadge.innerText = "VALID";
-    statusBadge.classList.add("valid");
-
-    const a = document.createElement("a");
-    a.href = url;
-    a.download = "SIGNED_{d['filename']}";
-    document.body.appendChild(a);
-    a.click();
-    a.remove();
-}}
-</script>
+    # Record registry tidak pernah berubah -> ETag stabil, scan ulang dapat 304
+    page = PUBLIC_PAGES.get(id)
+    if page is None:
+        page = render_verify_public(id, d)
+        PUBLIC_PAGES.put(id, page)
+    etag, html = page
 
-<p style="margin-top:20px;font-size:13px;text-align:center;color:#555">
-Sistem Digital Signature<br><b>Roby Sunjaya</b>
-</p>
-</div>
-</body>
-</html>
-"""
+    headers = {"ETag": etag, "Cache-Control": PUBLIC_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
 
 @app.get("/sign-page", response_class=HTMLResponse)
 async def sign_page():
@@ -524,8 +1297,9 @@ document.getElementById("verifyForm").addEventListener("submit", async function(
     if (!doc || !sig) return;
 
     const formData = new FormData();
-    formData.append("file", doc);
+    // signature dulu: server bisa langsung memilih hash_algorithm-nya
     formData.append("signature", sig);
+    formData.append("file", doc);
 
     const response = await fetch("/verify", {
         method: "POST",
@@ -558,38 +1332,115 @@ document.getElementById("verifyForm").addEventListener("submit", async function(
 </html>
 """
 
-from fastapi import HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+def record_paths(d):
+    doc_dir = d["doc_dir"]
+    if not doc_dir:
+        raise HTTPException(status_code=404, detail="File tidak lengkap")
+
+    sig_path = os.path.join(doc_dir, d["filename"] + ".sig.json")
+    sig_bin = sig_path[:-len(".json")] + ".bin"
+    # .sig.bin tidak membawa sertifikat: dipakai hanya jika tidak ada CA
+    if CERTIFICATES is None and os.path.exists(sig_bin):
+        sig_path = sig_bin
+    if d.get("blob_hash"):
+        return BLOBS.path(d["blob_hash"]), sig_path
+    return os.path.join(doc_dir, d["filename"]), sig_path
+
+async def verify_record(d):
+    # Verifikasi ulang dokumen di registry (hasil di-cache per versi file)
+    original_pdf, sig_path = record_paths(d)
+    try:
+        return await IO_POOL.run(
+            verify_cached,
+            VERIFY_CACHE,
+            original_pdf,
+            sig_path,
+            KEYRING.verify_key(),
+            CERTIFICATES
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File tidak lengkap")
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return {
+        "verify": VERIFY_CACHE.stats(),
+        "records": RECORD_CACHE.stats(),
+        "public_pages": PUBLIC_PAGES.stats(),
+        "missing_ids": MISSING_IDS.stats(),
+        "certificates": CERTIFICATES.cache.stats() if CERTIFICATES is not None else None
+    }
+
+@app.get("/api/verify/{verification_id}")
+async def api_verify(verification_id: str):
+    # Endpoint ringan (JSON) untuk QR scanner & integrasi
+    d = lookup_record(verification_id)
+
+    if d is None:
+        return JSONResponse(
+            status_code=404,
+            content={"verification_id": verification_id, "status": "NOT_FOUND"}
+        )
+
+    valid, message, signature_json, cache_hit = await verify_record(d)
+    AUDIT_LOG.append(audit.event(
+        "verify", endpoint="/api/verify", verification_id=verification_id,
+        valid=valid, message=message, cached=cache_hit
+    ), wait=False)
+
+    return {
+        "verification_id": verification_id,
+        "status": "VALID" if valid else "INVALID",
+        "valid": valid,
+        "message": message,
+        "filename": d["filename"],
+        "signer": signature_json["signer"]["name"],
+        "timestamp": signature_json["timestamp"],
+        "algorithm": signature_json["algorithm"],
+        "document_hash": signature_json["document_hash"],
+        "cached": cache_hit
+    }
+
+async def rebuild_signed_pdf(verification_id, doc_dir, original_pdf, signature_json, final_pdf):
+    # signature_page.pdf dihapus GC, jadi dibuat ulang dari signature ke
+    # file sementara (hasilnya sama persis dengan halaman saat /sign)
+    fd, signature_page = tempfile.mkstemp(prefix="signature_page_", suffix=".pdf", dir=doc_dir)
+    os.close(fd)
+    try:
+        await CPU_POOL.run(
+            create_signature_page,
+            output_path=signature_page,
+            signer=signature_json["signer"]["name"],
+            timestamp=signature_json["timestamp"],
+            algorithm=signature_json["algorithm"],
+            qr_data=f"{SERVER_HOST}/verify-public?id={verification_id}"
+        )
+        await CPU_POOL.run(merge_pdf, original_pdf, signature_page, final_pdf)
+    finally:
+        os.remove(signature_page)
+
 @app.get("/download/{verification_id}")
-async def download_signed_file(verification_id: str):
-    # 1️⃣ Load registry
-    with open(REGISTRY_PATH, "r") as f:
-        registry = json.load(f)
+async def download_signed_file(request: Request, verification_id: str):
+    # 1️⃣ Lookup registry (primary key)
+    d = lookup_record(verification_id)
 
-    if verification_id not in registry:
+    if d is None:
         raise HTTPException(status_code=404, detail="Data tidak ditemukan")
 
-    d = registry[verification_id]
+    original_pdf, sig_path = record_paths(d)
     doc_dir = d["doc_dir"]
 
-    original_pdf = os.path.join(doc_dir, d["filename"])
-    sig_path = original_pdf + ".sig.json"
-    signature_page = os.path.join(doc_dir, "signature_page.pdf")
-
     # 2️⃣ Pastikan file ada
-    if not all(map(os.path.exists, [original_pdf, sig_path, signature_page])):
+    if not all(map(os.path.exists, [original_pdf, sig_path])):
         raise HTTPException(status_code=404, detail="File tidak lengkap")
 
-    # 3️⃣ Load signature JSON
-    with open(sig_path, "r") as f:
-        signature_json = json.load(f)
+    # 3️⃣ + 4️⃣ Load signature JSON & VERIFIKASI ULANG (INTI KEAMANAN)
+    with STAGE_LATENCY.time("/download", "verify"):
+        valid, message, signature_json, cache_hit = await verify_record(d)
 
-    # 4️⃣ VERIFIKASI ULANG (INTI KEAMANAN)
-    valid, message = verify_document(
-        original_pdf,
-        signature_json,
-        PUBLIC_KEY
-    )
+    AUDIT_LOG.append(audit.event(
+        "download", verification_id=verification_id, valid=valid, message=message
+    ), wait=False)
 
     if not valid:
         return JSONResponse(
@@ -601,11 +1452,23 @@ async def download_signed_file(verification_id: str):
     final_pdf = os.path.join(doc_dir, "SIGNED_" + d["filename"])
 
     if not os.path.exists(final_pdf):
-        merge_pdf(original_pdf, signature_page, final_pdf)
+        with STAGE_LATENCY.time("/download", "merge"):
+            await rebuild_signed_pdf(verification_id, doc_dir, original_pdf, signature_json, final_pdf)
 
     # 6️⃣ Download hasil FINAL
+    # Validasi tetap dijalankan di atas; klien yang sudah punya versi sama
+    # cukup mendapat 304. Range/206 & If-Range ditangani FileResponse, dan
+    # server yang mendukung "http.response.pathsend" mengirim file zero-copy.
+    with STAGE_LATENCY.time("/download", "etag"):
+        etag = await IO_POOL.run(signed_etag, final_pdf)
+    headers = {"ETag": etag, "Cache-Control": DOWNLOAD_CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
     return FileResponse(
         final_pdf,
         filename="SIGNED_" + d["filename"],
-        media_type="application/pdf"
+        media_type="application/pdf",
+        headers=headers
     )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Float, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -9,3 +9,65 @@ class Signature(Base):
     filename = Column(String)
     hash = Column(String)
     signature = Column(String)
+
+class VerificationRecord(Base):
+    __tablename__ = "verification_registry"
+    verification_id = Column(String, primary_key=True)
+    filename = Column(String, nullable=False)
+    signed_filename = Column(String)
+    doc_dir = Column(String)
+    document_hash = Column(String, index=True)
+    timestamp = Column(String, index=True)
+    signer = Column(String, index=True)
+    algorithm = Column(String)
+    blob_hash = Column(String, index=True)
+
+    def to_dict(self):
+        return {
+            "filename": self.filename,
+            "signed_filename": self.signed_filename,
+            "doc_dir": self.doc_dir,
+            "document_hash": self.document_hash,
+            "timestamp": self.timestamp,
+            "signer": self.signer,
+            "algorithm": self.algorithm,
+            "blob_hash": self.blob_hash
+        }
+
+class Blob(Base):
+    __tablename__ = "blobs"
+    hash = Column(String, primary_key=True)  # SHA-256 hex
+    size = Column(Integer, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+
+class SignJob(Base):
+    __tablename__ = "sign_jobs"
+    job_id = Column(String, primary_key=True)
+    status = Column(String, nullable=False, index=True)  # QUEUED/RUNNING/DONE/FAILED
+    stage = Column(String)
+    document_hash = Column(String, index=True)  # SHA-256 hex
+    filename = Column(String, nullable=False)
+    doc_dir = Column(String, nullable=False)
+    verification_id = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    created_at = Column(String, nullable=False)
+    updated_at = Column(String, nullable=False)
+    # proses yang sedang memegang job + batas lease (epoch detik)
+    owner = Column(String, index=True)
+    lease_until = Column(Float)
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "document_hash": self.document_hash,
+            "filename": self.filename,
+            "doc_dir": self.doc_dir,
+            "verification_id": self.verification_id,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
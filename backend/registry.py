@@ -0,0 +1,143 @@
+from sqlalchemy import delete, func, inspect, select, text
+import json, os
+
+from database import engine, SessionLocal
+from models.signature import Base, VerificationRecord
+
+FIELDS = (
+    "filename", "signed_filename", "doc_dir",
+    "document_hash", "timestamp", "signer", "algorithm", "blob_hash"
+)
+
+# kolom yang ditambahkan setelah tabel pertama kali dibuat
+ADDED_COLUMNS = {
+    "verification_registry": {"blob_hash": "VARCHAR"},
+    "sign_jobs": {"owner": "VARCHAR", "lease_until": "FLOAT"},
+}
+
+
+def _add_missing_columns():
+    for table, added in ADDED_COLUMNS.items():
+        columns = {c["name"] for c in inspect(engine).get_columns(table)}
+        with engine.begin() as conn:
+            for name, sql_type in added.items():
+                if name not in columns:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+                    conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{name} ON {table} ({name})"))
+
+
+def init_registry(json_path=None):
+    Base.metadata.create_all(engine)
+    _add_missing_columns()
+    if json_path and os.path.exists(json_path):
+        migrate_json(json_path)
+
+
+def migrate_json(json_path):
+    """Pindahkan verification_registry.json lama ke SQLite (sekali jalan).
+
+    Setelah berhasil, file JSON di-rename menjadi *.migrated supaya
+    migrasi tidak diulang di startup berikutnya.
+    """
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    with SessionLocal.begin() as session:
+        existing = set(session.scalars(select(VerificationRecord.verification_id)))
+        for verification_id, d in data.items():
+            if verification_id in existing:
+                continue
+            session.add(VerificationRecord(
+                verification_id=verification_id,
+                **{k: d.get(k) for k in FIELDS}
+            ))
+
+    os.replace(json_path, json_path + ".migrated")
+    return len(data)
+
+
+def get_record(verification_id):
+    with SessionLocal() as session:
+        record = session.get(VerificationRecord, verification_id)
+        return record.to_dict() if record else None
+
+
+def add_record(verification_id, **data):
+    with SessionLocal.begin() as session:
+        session.add(VerificationRecord(
+            verification_id=verification_id,
+            **{k: data.get(k) for k in FIELDS}
+        ))
+
+
+def add_records(records):
+    # banyak baris dalam satu transaksi (dipakai /sign/batch)
+    with SessionLocal.begin() as session:
+        session.add_all([
+            VerificationRecord(
+                verification_id=verification_id,
+                **{k: data.get(k) for k in FIELDS}
+            )
+            for verification_id, data in records
+        ])
+
+
+def restore_records(records):
+    """Tambahkan record yang belum ada (replay audit log), satu transaksi.
+    Mengembalikan jumlah record yang ditambahkan."""
+    with SessionLocal.begin() as session:
+        ids = [verification_id for verification_id, _ in records]
+        existing = set(session.scalars(
+            select(VerificationRecord.verification_id)
+            .where(VerificationRecord.verification_id.in_(ids))
+        ))
+        added = 0
+        for verification_id, data in records:
+            if verification_id in existing:
+                continue
+            existing.add(verification_id)
+            session.add(VerificationRecord(
+                verification_id=verification_id,
+                **{k: data.get(k) for k in FIELDS}
+            ))
+            added += 1
+        return added
+
+
+def count_records():
+    with SessionLocal() as session:
+        return session.scalar(select(func.count()).select_from(VerificationRecord))
+
+
+def doc_dir_names():
+    # nama folder (basename) semua dokumen, dipakai GC untuk mengenali
+    # folder yatim tanpa bergantung pada bentuk path UPLOAD_DIR
+    with SessionLocal() as session:
+        return {
+            os.path.basename(doc_dir)
+            for doc_dir in session.scalars(select(VerificationRecord.doc_dir))
+            if doc_dir
+        }
+
+
+def expired_records(cutoff, limit):
+    # record dengan timestamp (ISO, WIB) sebelum cutoff, paling lama dulu
+    with SessionLocal() as session:
+        rows = session.scalars(
+            select(VerificationRecord)
+            .where(VerificationRecord.timestamp < cutoff)
+            .order_by(VerificationRecord.timestamp)
+            .limit(limit)
+        )
+        return [dict(r.to_dict(), verification_id=r.verification_id) for r in rows]
+
+
+def delete_record(verification_id):
+    # True hanya untuk pemanggil yang benar-benar menghapus (GC di
+    # beberapa worker tidak me-release blob yang sama dua kali)
+    with SessionLocal.begin() as session:
+        result = session.execute(
+            delete(VerificationRecord)
+            .where(VerificationRecord.verification_id == verification_id)
+        )
+        return result.rowcount > 0
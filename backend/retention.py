@@ -0,0 +1,207 @@
+# Retensi dan garbage collection folder upload.
+#
+# Folder dokumen baru di-shard per hash nama folder supaya tidak ada satu
+# direktori berisi puluhan ribu entri:
+#   <UPLOAD_DIR>/docs/ab/cd/<YYYYmmdd_HHMMSS>_<id>/
+# Folder lama (flat, <UPLOAD_DIR>/<folder>/) tetap dibaca dan ikut di-GC.
+#
+#   python -m retention --upload-dir ../uploads --retention-days 365
+from datetime import datetime, timedelta
+import argparse, asyncio, hashlib, logging, os, shutil, sys, time
+
+import registry, jobs
+from crypto.sign import WIB
+
+logger = logging.getLogger(__name__)
+
+DOCS_DIR = "docs"
+# isi root UPLOAD_DIR yang bukan folder dokumen
+RESERVED = {"blobs", DOCS_DIR}
+# bisa dibuat ulang dari signature + registry kapan saja
+INTERMEDIATES = ("qr.png", "signature_page.pdf")
+
+
+def doc_dir_path(upload_dir, folder):
+    digest = hashlib.sha256(folder.encode()).hexdigest()
+    return os.path.join(upload_dir, DOCS_DIR, digest[:2], digest[2:4], folder)
+
+
+def _scandir(path):
+    try:
+        with os.scandir(path) as it:
+            yield from it
+    except FileNotFoundError:
+        return
+
+
+def iter_doc_dirs(upload_dir):
+    """Semua folder dokumen (layout flat lama, lalu layout shard)."""
+    for entry in _scandir(upload_dir):
+        if entry.name not in RESERVED and entry.is_dir(follow_symlinks=False):
+            yield entry.path
+    for a in _scandir(os.path.join(upload_dir, DOCS_DIR)):
+        for b in _scandir(a.path):
+            for entry in _scandir(b.path):
+                if entry.is_dir(follow_symlinks=False):
+                    yield entry.path
+
+
+def _age(path, now):
+    try:
+        return now - os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+class GarbageCollector:
+    """GC folder upload yang berjalan bertahap.
+
+    Satu putaran (steps()) memproses paling banyak batch_size record atau
+    folder per langkah; runner memberi jeda batch_delay detik di antara
+    langkah supaya disk tidak dibanjiri operasi hapus.
+
+      expired       record lebih tua dari retention_days (0 = simpan
+                    selamanya): record dihapus, blob di-release, folder
+                    dihapus
+      orphan        folder tanpa record maupun job aktif yang tidak
+                    berubah selama orphan_grace detik (termasuk batch_*)
+      intermediate  qr.png dan signature_page.pdf yang lebih tua dari
+                    intermediate_ttl detik
+    """
+
+    def __init__(self, upload_dir, blobs, retention_days=0, orphan_grace=86400,
+                 intermediate_ttl=3600, batch_size=100, batch_delay=1.0, on_expire=None):
+        self.upload_dir = upload_dir
+        self.blobs = blobs
+        self.retention_days = retention_days
+        self.orphan_grace = orphan_grace
+        self.intermediate_ttl = intermediate_ttl
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.on_expire = on_expire
+        self._task = None
+
+    def steps(self, now=None):
+        """Generator satu putaran GC; tiap langkah yield jumlah yang dihapus."""
+        now = time.time() if now is None else now
+
+        if self.retention_days > 0:
+            cutoff = (datetime.fromtimestamp(now, WIB) - timedelta(days=self.retention_days)).isoformat()
+            while True:
+                records = registry.expired_records(cutoff, self.batch_size)
+                if not records:
+                    break
+                yield {"expired": self.expire(records)}
+
+        # diambil sekali per putaran; folder yang lebih baru dari
+        # orphan_grace tidak pernah dihapus, jadi upload yang sedang
+        # berjalan aman
+        referenced = registry.doc_dir_names() | jobs.active_doc_dir_names()
+        batch = []
+        for path in iter_doc_dirs(self.upload_dir):
+            batch.append(path)
+            if len(batch) >= self.batch_size:
+                yield self.sweep(batch, referenced, now)
+                batch = []
+        if batch:
+            yield self.sweep(batch, referenced, now)
+
+    def expire(self, records):
+        count = 0
+        for r in records:
+            if not registry.delete_record(r["verification_id"]):
+                continue  # sudah dihapus worker lain
+            if r["blob_hash"]:
+                self.blobs.release(r["blob_hash"])
+            if r["doc_dir"]:
+                shutil.rmtree(r["doc_dir"], ignore_errors=True)
+            if self.on_expire is not None:
+                self.on_expire(r["verification_id"])
+            count += 1
+        return count
+
+    def sweep(self, paths, referenced, now):
+        counts = {"orphan": 0, "intermediate": 0}
+        for path in paths:
+            if os.path.basename(path) not in referenced:
+                age = _age(path, now)
+                if age is not None and age > self.orphan_grace:
+                    shutil.rmtree(path, ignore_errors=True)
+                    counts["orphan"] += 1
+                continue
+            for name in INTERMEDIATES:
+                file_path = os.path.join(path, name)
+                age = _age(file_path, now)
+                if age is not None and age > self.intermediate_ttl:
+                    try:
+                        os.remove(file_path)
+                        counts["intermediate"] += 1
+                    except FileNotFoundError:
+                        pass
+        return counts
+
+    def run_once(self):
+        totals = {}
+        for counts in self.steps():
+            for kind, n in counts.items():
+                totals[kind] = totals.get(kind, 0) + n
+            time.sleep(self.batch_delay)
+        return totals
+
+    def start(self, executor, interval, on_step=None):
+        self._task = asyncio.create_task(self._run(executor, interval, on_step))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, executor, interval, on_step):
+        while True:
+            try:
+                steps = self.steps()
+                while True:
+                    # langkah GC (I/O + SQLite) di executor, jeda di event loop
+                    counts = await executor.run(next, steps, None)
+                    if counts is None:
+                        break
+                    if on_step is not None:
+                        on_step(counts)
+                    await asyncio.sleep(self.batch_delay)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("GC folder upload gagal")
+            await asyncio.sleep(interval)
+
+
+def main(argv):
+    from utils.blobstore import BlobStore
+
+    parser = argparse.ArgumentParser(prog="python -m retention")
+    parser.add_argument("--upload-dir", default=os.environ.get(
+        "UPLOAD_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "../uploads")))
+    parser.add_argument("--retention-days", type=float, default=0)
+    parser.add_argument("--orphan-grace", type=float, default=86400)
+    parser.add_argument("--intermediate-ttl", type=float, default=3600)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-delay", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    registry.init_registry()
+    gc = GarbageCollector(
+        args.upload_dir,
+        BlobStore(os.path.join(args.upload_dir, "blobs")),
+        retention_days=args.retention_days,
+        orphan_grace=args.orphan_grace,
+        intermediate_ttl=args.intermediate_ttl,
+        batch_size=args.batch_size,
+        batch_delay=args.batch_delay
+    )
+    print(gc.run_once())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
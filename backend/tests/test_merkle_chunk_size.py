@@ -0,0 +1,109 @@
+# chunk_size Merkle dari signature JSON tidak tepercaya: nilai yang tidak
+# valid harus ditolak (400), bukan hang / 500 / ledakan memori.
+#
+#   cd backend && python -m pytest -q tests
+import copy, importlib, json, os, sys
+
+import pytest
+
+from crypto.merkle import MERKLE_CHUNK_SIZE, MerkleHasher, merkle_chunk_size, merkle_tree
+
+BAD_MERKLE = [
+    {"chunk_size": 0},
+    {"chunk_size": -5},
+    {"chunk_size": 1},
+    {"chunk_size": 3 * 1024 * 1024},       # bukan pangkat dua
+    {"chunk_size": 128 * 1024 * 1024},     # di atas batas
+    {"chunk_size": "4194304"},
+    {"chunk_size": True},
+    "x",
+    [],
+]
+
+
+@pytest.mark.parametrize("merkle", BAD_MERKLE)
+def test_merkle_chunk_size_rejects(merkle):
+    with pytest.raises(ValueError):
+        merkle_chunk_size({"merkle": merkle})
+
+
+@pytest.mark.parametrize("chunk_size", [0, -5, 1])
+def test_hasher_and_tree_reject(chunk_size):
+    with pytest.raises(ValueError):
+        MerkleHasher(chunk_size)
+    with pytest.raises(ValueError):
+        merkle_tree(b"data", chunk_size)
+
+
+def test_merkle_chunk_size_default():
+    assert merkle_chunk_size({}) == MERKLE_CHUNK_SIZE
+    assert merkle_chunk_size({"merkle": {"chunk_size": 64 * 1024}}) == 64 * 1024
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("verify")
+    env = {
+        "UPLOAD_DIR": str(tmp / "uploads"),
+        "SIGNATURE_DB": str(tmp / "signature.db"),
+        "REGISTRY_PATH": str(tmp / "verification_registry.json"),
+        "AUDIT_DIR": str(tmp / "audit"),
+        "PROFILE_DIR": str(tmp / "profiles"),
+        "GC_INTERVAL": "0",
+        "WARM_IMPORTS": "0",
+        "SIGN_HASH_ALGORITHM": "SHA-256-MERKLE",
+    }
+    saved = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    for name in ("main", "database", "registry", "jobs"):
+        sys.modules.pop(name, None)
+    main = importlib.import_module("main")
+    from fastapi.testclient import TestClient
+    from benchmarks.synthetic import make_pdf
+
+    pdf = tmp / "doc.pdf"
+    make_pdf(str(pdf), pages=1)
+    try:
+        with TestClient(main.app) as c:
+            with open(pdf, "rb") as f:
+                r = c.post("/sign", files={"file": ("doc.pdf", f, "application/pdf")})
+            assert r.status_code == 200, r.text
+            record = main.registry.get_record(r.json()["verification_id"])
+            with open(os.path.join(record["doc_dir"], "doc.pdf.sig.json")) as f:
+                signature = json.load(f)
+            assert signature["hash_algorithm"] == "SHA-256-MERKLE"
+            yield c, pdf.read_bytes(), signature
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def _verify(c, data, signature, signature_first):
+    sig = ("signature", (None, json.dumps(signature)))
+    doc = ("file", ("doc.pdf", data, "application/pdf"))
+    return c.post("/verify", files=[sig, doc] if signature_first else [doc, sig])
+
+
+@pytest.mark.parametrize("signature_first", [True, False])
+@pytest.mark.parametrize("merkle", BAD_MERKLE)
+def test_verify_bad_chunk_size(client, merkle, signature_first):
+    c, data, signature = client
+    bad = copy.deepcopy(signature)
+    if isinstance(merkle, dict):
+        bad["merkle"].update(merkle)
+    else:
+        bad["merkle"] = merkle
+    r = _verify(c, data, bad, signature_first)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "File signature tidak valid"
+
+
+@pytest.mark.parametrize("signature_first", [True, False])
+def test_verify_valid_merkle(client, signature_first):
+    c, data, signature = client
+    r = _verify(c, data, signature, signature_first)
+    assert r.status_code == 200
+    assert r.json()["valid"] is True
@@ -0,0 +1,55 @@
+# hash_algorithm (dan chunk_size Merkle) ikut ditandatangani: signature
+# yang labelnya diganti harus ditolak.
+#
+#   cd backend && python -m pytest -q tests
+import base64, hashlib, os
+
+import pytest
+from nacl.signing import SigningKey
+
+from crypto.merkle import MERKLE_ALGORITHM, merkle_tree
+from crypto.sidecar import encode_sidecar, verify_binary
+from crypto.sign import sign_document
+from crypto.verify import verify_document
+
+CHUNK = 64 * 1024
+DOC = os.urandom(CHUNK + 1000)  # dua daun Merkle
+
+
+@pytest.fixture(scope="module")
+def key():
+    return SigningKey.generate()
+
+
+@pytest.mark.parametrize("algorithm", ["SHA-256", "SHA-512", "BLAKE2b", MERKLE_ALGORITHM])
+def test_sign_verify_roundtrip(key, algorithm):
+    signature = sign_document(DOC, key, "Penguji", hash_algorithm=algorithm, chunk_size=CHUNK)
+    assert verify_document(DOC, signature, key.verify_key) == (True, "Signature VALID")
+
+
+def test_merkle_relabelled_as_sha256(key):
+    signature = sign_document(DOC, key, "Penguji", hash_algorithm=MERKLE_ALGORITHM, chunk_size=CHUNK)
+    leaves = merkle_tree(DOC, CHUNK).leaves
+    # dokumen palsu yang SHA-256 biasanya sama dengan root Merkle
+    forged = b"\x01" + leaves[0] + leaves[1]
+    assert base64.b64encode(hashlib.sha256(forged).digest()).decode() == signature["document_hash"]
+
+    relabelled = dict(signature, hash_algorithm="SHA-256")
+    relabelled.pop("merkle")
+    assert verify_document(forged, relabelled, key.verify_key)[0] is False
+    # tanpa hash_algorithm (default SHA-256) juga ditolak
+    relabelled.pop("hash_algorithm")
+    assert verify_document(forged, relabelled, key.verify_key)[0] is False
+
+
+def test_merkle_chunk_size_relabelled(key):
+    signature = sign_document(DOC, key, "Penguji", hash_algorithm=MERKLE_ALGORITHM, chunk_size=CHUNK)
+    relabelled = dict(signature, merkle=dict(signature["merkle"], chunk_size=2 * CHUNK))
+    assert verify_document(DOC, relabelled, key.verify_key)[0] is False
+
+
+def test_binary_sidecar_roundtrip(key):
+    # payload sidecar (dengan hash_algorithm) cocok dengan cek prefix
+    for algorithm in ("SHA-256", "SHA-512"):
+        signature = sign_document(DOC, key, "Penguji", hash_algorithm=algorithm)
+        assert verify_binary(DOC, encode_sidecar(signature), key.verify_key) == (True, "Signature VALID")
@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio, gzip, json, logging, os, re, shutil
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# <prefix>-<pid>-<seq>.jsonl, setelah rotasi <...>.jsonl.gz
+_SEGMENT = re.compile(r"^(?P<name>.+)-(?P<pid>\d+)-(?P<seq>\d+)\.jsonl(?P<gz>\.gz)?$")
+
+
+class AuditLog:
+    """Log audit append-only (JSONL) dengan group commit.
+
+    append() dipanggil dari event loop. Satu writer task mengambil semua
+    event yang sedang menunggu lalu menulisnya dengan satu write() dan
+    satu fsync di thread khusus; event yang datang selama fsync berjalan
+    ikut batch berikutnya. Jadi N request bersamaan berbagi satu fsync,
+    bukan N.
+
+    Tiap proses menulis segment sendiri (<prefix>-<pid>-<seq>.jsonl).
+    Segment dirotasi setelah max_segment_bytes dan dikompres gzip di
+    background.
+    """
+
+    def __init__(self, directory, prefix="audit", max_segment_bytes=64 * MB, compress=True, fsync=True):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.compress = compress
+        self.fsync = fsync
+        self.events = 0
+        self.commits = 0
+        self._pending = []  # (line, future atau None)
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._file = None
+        self._path = None
+        self._seq = 0
+        self._size = 0
+        self._writer_pool = None
+        self._compress_pool = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit")
+        self._compress_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit_gz")
+
+        # selalu mulai segment baru: ekor segment lama yang mungkin
+        # terpotong (crash) tidak pernah ditambah
+        pid = os.getpid()
+        seqs = [int(m.group("seq")) for m in map(_SEGMENT.match, os.listdir(self.directory))
+                if m and m.group("name") == self.prefix and int(m.group("pid")) == pid]
+        self._seq = max(seqs, default=0)
+        self._open_next()
+        self._task = asyncio.create_task(self._writer())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # sisa antrean ditulis dulu sebelum file ditutup
+        batch, self._pending = self._pending, []
+        if batch:
+            await self._loop.run_in_executor(self._writer_pool, self._commit, [line for line, _ in batch])
+        await self._loop.run_in_executor(self._writer_pool, self._file.close)
+        self._writer_pool.shutdown(wait=True)
+        self._compress_pool.shutdown(wait=True)
+
+    def append(self, event, wait=True):
+        """Antrekan satu event (dict).
+
+        wait=True: kembalikan future yang selesai setelah event ter-fsync.
+        wait=False: tidak menunggu (event tetap ikut group commit berikutnya).
+        """
+        line = (json.dumps(event, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        future = self._loop.create_future() if wait else None
+        self._pending.append((line, future))
+        self._wakeup.set()
+        return future
+
+    def append_threadsafe(self, event):
+        # dari thread lain (mis. GC di executor): fire-and-forget
+        self._loop.call_soon_threadsafe(self.append, event, False)
+
+    async def _writer(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            batch, self._pending = self._pending, []
+            if not batch:
+                continue
+            try:
+                await self._loop.run_in_executor(self._writer_pool, self._commit, [line for line, _ in batch])
+            except Exception as exc:
+                logger.exception("Gagal menulis audit log")
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_exception(exc)
+            else:
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_result(None)
+
+    def _commit(self, lines):
+        # hanya dijalankan di _writer_pool (satu thread), tanpa lock
+        data = b"".join(lines)
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._size += len(data)
+        self.events += len(lines)
+        self.commits += 1
+        if self._size >= self.max_segment_bytes:
+            self._rotate()
+
+    def _open_next(self):
+        self._seq += 1
+        name = "%s-%d-%06d.jsonl" % (self.prefix, os.getpid(), self._seq)
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, "ab")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        if self.compress:
+            self._compress_pool.submit(compress_segment, self._path)
+        self._open_next()
+
+
+def compress_segment(path):
+    # .jsonl -> .jsonl.gz; .jsonl baru dihapus setelah .gz utuh di disk
+    tmp = path + ".gz.tmp"
+    with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path + ".gz")
+    os.remove(path)
+
+
+def segment_paths(directory, prefix="audit"):
+    """Segment urut (pid, seq). Jika .jsonl dan .jsonl.gz sama-sama ada
+    (crash saat kompresi), yang dipakai .jsonl."""
+    segments = {}
+    for name in os.listdir(directory):
+        m = _SEGMENT.match(name)
+        if not m or m.group("name") != prefix:
+            continue
+        key = (int(m.group("pid")), int(m.group("seq")))
+        if key not in segments or not m.group("gz"):
+            segments[key] = os.path.join(directory, name)
+    return [segments[key] for key in sorted(segments)]
+
+
+def iter_events(directory, prefix="audit"):
+    # baris yang tidak utuh (ekor segment saat crash) dilewati
+    for path in segment_paths(directory, prefix):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("Baris audit rusak dilewati: %s", path)
@@ -0,0 +1,84 @@
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+import errno, os
+
+from database import SessionLocal
+from models.signature import Blob
+from utils.fileops import clone_file
+
+# Penyimpanan dokumen asli berbasis isi (content-addressed):
+#   <root>/ab/cd/abcd....  (nama file = SHA-256 hex dokumen)
+# Dokumen yang sama hanya disimpan sekali; jumlah referensi dari registry
+# dicatat di tabel "blobs".
+
+class BlobStore:
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def _link_or_copy(self, src, dst):
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            raise
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            tmp = dst + ".tmp"
+            clone_file(src, tmp)
+            try:
+                os.link(tmp, dst)
+            finally:
+                os.remove(tmp)
+
+    def put(self, src_path, digest, move=True):
+        """Masukkan file ke store dan tambah refcount.
+
+        move=True: src_path dihapus setelah masuk store (upload baru).
+        Jika isi yang sama sudah ada, file baru dibuang (dedup).
+        """
+        dst = self.path(digest)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+
+        # operasi file dilakukan selagi memegang write lock SQLite, supaya
+        # tidak balapan dengan release() dari proses/worker lain
+        with SessionLocal.begin() as session:
+            session.execute(
+                insert(Blob)
+                .values(hash=digest, size=os.path.getsize(src_path), refcount=1)
+                .on_conflict_do_update(
+                    index_elements=[Blob.hash],
+                    set_={"refcount": Blob.refcount + 1}
+                )
+            )
+            try:
+                self._link_or_copy(src_path, dst)
+            except FileExistsError:
+                pass  # dokumen sudah pernah disimpan
+
+        if move:
+            os.remove(src_path)
+        return dst
+
+    def release(self, digest):
+        """Kurangi refcount; hapus blob jika tidak dirujuk lagi."""
+        with SessionLocal.begin() as session:
+            # UPDATE dulu supaya write lock langsung diambil
+            session.execute(
+                update(Blob).where(Blob.hash == digest)
+                .values(refcount=Blob.refcount - 1)
+            )
+            remaining = session.scalar(select(Blob.refcount).where(Blob.hash == digest))
+            if remaining is None or remaining > 0:
+                return False
+            session.execute(delete(Blob).where(Blob.hash == digest))
+            try:
+                os.remove(self.path(digest))
+            except FileNotFoundError:
+                pass
+        return True
@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import asyncio, functools, os, threading, time
+
+from utils.profiling import CURRENT_PROFILE, profiled_call
+
+
+class ExecutorBusy(Exception):
+    pass
+
+
+def _timed_call(submitted_at, fn, args, kwargs):
+    # dijalankan di worker: catat kapan task mulai dikerjakan
+    started_at = time.time()
+    return started_at - submitted_at, fn(*args, **kwargs)
+
+
+class StageExecutor:
+    """Pool terbatas untuk pekerjaan blocking di luar event loop.
+
+    kind="thread"  -> I/O (copy file, hashing, nacl)
+    kind="process" -> CPU berat (halaman tanda tangan, PyPDF2)
+
+    Jumlah task yang menunggu dibatasi max_queue; jika penuh,
+    run() melempar ExecutorBusy.
+    """
+
+    def __init__(self, name, kind, max_workers, max_queue):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix=self.name
+                        )
+        return self._pool
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._pending - self.max_workers >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorBusy(self.name)
+            self._pending += 1
+
+        # request yang sedang diprofil: jalankan fn di bawah cProfile di worker
+        session = CURRENT_PROFILE.get()
+        if session is not None:
+            fn = functools.partial(profiled_call, session.path_for(fn), fn)
+
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(_timed_call, time.time(), fn, args, kwargs)
+            wait, result = await loop.run_in_executor(self._get_pool(), call)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "queue_depth": max(0, self._pending - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_avg_ms": (self._wait_total / self._completed * 1000) if self._completed else 0.0,
+                "wait_max_ms": self._wait_max * 1000
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+# Konfigurasi lewat environment variable
+IO_POOL = StageExecutor(
+    "io", "thread",
+    max_workers=int(os.environ.get("IO_WORKERS", 8)),
+    max_queue=int(os.environ.get("IO_MAX_QUEUE", 64))
+)
+CPU_POOL = StageExecutor(
+    "cpu", "process",
+    max_workers=int(os.environ.get("CPU_WORKERS", os.cpu_count() or 2)),
+    max_queue=int(os.environ.get("CPU_MAX_QUEUE", 32))
+)
+
+# Pipeline penuh per dokumen untuk /sign/batch
+BATCH_POOL = StageExecutor(
+    "batch", "process",
+    max_workers=int(os.environ.get("BATCH_WORKERS", os.cpu_count() or 2)),
+    max_queue=int(os.environ.get("BATCH_MAX_QUEUE", 16))
+)
+
+
+def executor_stats():
+    return {"io": IO_POOL.stats(), "cpu": CPU_POOL.stats(), "batch": BATCH_POOL.stats()}
+
+
+def shutdown_executors():
+    IO_POOL.shutdown()
+    CPU_POOL.shutdown()
+    BATCH_POOL.shutdown()
@@ -0,0 +1,61 @@
+import asyncio, logging
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Antrean job lokal (tanpa broker) di event loop.
+
+    workers coroutine mengambil job_id dari asyncio.Queue dan menjalankan
+    handler(job_id). Jika handler melempar exception, job diulang sampai
+    max_attempts kali dengan jeda retry_delay * 2^(n-1) detik; setelah
+    itu on_failure(job_id, exc) dipanggil. handler harus idempotent.
+    """
+
+    def __init__(self, handler, on_failure, workers=2, max_attempts=3, retry_delay=2.0):
+        self.handler = handler
+        self.on_failure = on_failure
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue = None
+        self._tasks = []
+        self._retries = set()
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        # job yang terpotong tetap QUEUED/RUNNING di DB dan dilanjutkan saat start
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+    def submit(self, job_id, attempt=1):
+        self._queue.put_nowait((job_id, attempt))
+
+    async def _retry_later(self, job_id, attempt):
+        await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+        self.submit(job_id, attempt + 1)
+
+    async def _worker(self):
+        while True:
+            job_id, attempt = await self._queue.get()
+            try:
+                await self.handler(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Job %s gagal (percobaan %d)", job_id, attempt)
+                if attempt < self.max_attempts:
+                    task = asyncio.create_task(self._retry_later(job_id, attempt))
+                    self._retries.add(task)
+                    task.add_done_callback(self._retries.discard)
+                else:
+                    await self.on_failure(job_id, exc)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,220 @@
+from bisect import bisect_left
+import time
+
+
+# Bucket latency (detik): 1 ms .. 60 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                    for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Dasar metric.
+
+    Update dipanggil dari event loop (satu thread), jadi tidak memakai
+    lock: lock saja sudah lebih mahal dari seluruh observe(). Dari thread
+    lain tetap aman di bawah GIL, paling buruk satu increment hilang.
+    """
+
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+
+    def header(self):
+        return ["# HELP %s %s" % (self.name, self.help), "# TYPE %s %s" % (self.name, self.kind)]
+
+    def render(self):
+        lines = self.header()
+        items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(self.name + _format_labels(self.label_names, labels) + " " + _format_value(value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram(_Metric):
+    """Histogram dengan bucket tetap.
+
+    Satu observe() = bisect + tambah dua angka, jadi cukup murah untuk
+    dibiarkan aktif di production.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        state = self._values.get(labels)
+        if state is None:
+            # [count per bucket (+Inf di akhir), sum]
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = self.header()
+        items = sorted((labels, (list(state[0]), state[1])) for labels, state in self._values.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(self.name + "_bucket"
+                             + _format_labels(self.label_names, labels, ("le", _format_value(bound)))
+                             + " " + str(cumulative))
+            suffix = _format_labels(self.label_names, labels)
+            lines.append(self.name + "_sum" + suffix + " " + repr(total))
+            lines.append(self.name + "_count" + suffix + " " + str(cumulative))
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self.register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        # format teks Prometheus (text/plain; version=0.0.4)
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+STAGE_LATENCY = METRICS.histogram(
+    "signature_stage_duration_seconds",
+    "Durasi tiap tahap pipeline (termasuk antre di executor)",
+    labels=("endpoint", "stage")
+)
+REQUESTS = METRICS.counter(
+    "signature_requests_total",
+    "Jumlah request per endpoint dan status HTTP",
+    labels=("endpoint", "method", "status")
+)
+REQUEST_LATENCY = METRICS.histogram(
+    "signature_request_duration_seconds",
+    "Durasi request per endpoint",
+    labels=("endpoint", "method")
+)
+IN_FLIGHT = METRICS.gauge(
+    "signature_requests_in_flight",
+    "Request yang sedang diproses",
+    labels=("endpoint",)
+)
+UPLOAD_BYTES = METRICS.counter(
+    "signature_upload_bytes_total",
+    "Total byte dokumen yang diterima",
+    labels=("endpoint",)
+)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: counter, latency dan in-flight per endpoint.
+
+    Hanya path dengan prefix di endpoints yang dicatat (label = prefix),
+    supaya label tidak meledak karena id di URL atau file static.
+    """
+
+    def __init__(self, app, endpoints):
+        self.app = app
+        # prefix terpanjang dicek lebih dulu (/sign/batch sebelum /sign)
+        self.endpoints = sorted(endpoints, key=len, reverse=True)
+
+    def match(self, path):
+        for prefix in self.endpoints:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+    async def __call__(self, scope, receive, send):
+        endpoint = self.match(scope["path"]) if scope["type"] == "http" else None
+        if endpoint is None:
+            return await self.app(scope, receive, send)
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(endpoint)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec(endpoint)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint, scope["method"])
+            REQUESTS.inc(endpoint, scope["method"], str(status[0]))
@@ -0,0 +1,91 @@
+from contextvars import ContextVar
+import cProfile, hmac, os, pstats, random, re, uuid
+
+
+class ProfileSession:
+    """Profil satu request: satu file .prof per fungsi yang dijalankan
+    di executor (panggilan berulang, mis. per chunk upload, digabung)."""
+
+    def __init__(self, request_id, directory):
+        self.request_id = request_id
+        self.directory = directory
+        self._paths = {}
+
+    def path_for(self, fn):
+        name = re.sub(r"[^A-Za-z0-9_]", "_", getattr(fn, "__name__", "call"))
+        if name not in self._paths:
+            self._paths[name] = os.path.join(
+                self.directory, "%02d_%s.prof" % (len(self._paths) + 1, name))
+        return self._paths[name]
+
+
+# diset middleware selama request yang diprofil berjalan
+CURRENT_PROFILE = ContextVar("current_profile", default=None)
+
+
+def profiled_call(path, fn, *args, **kwargs):
+    # dijalankan di worker (thread/process) sehingga ikut ter-pickle
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # profiler lain sedang aktif (Python 3.12+: satu per interpreter)
+        return fn(*args, **kwargs)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        stats = pstats.Stats(profiler)
+        if os.path.exists(path):
+            stats.add(path)
+        stats.dump_stats(path)
+
+
+class ProfilingMiddleware:
+    """Profiling per request yang opt-in.
+
+    Request diprofil jika membawa header X-Profile berisi token admin,
+    atau terpilih oleh sampling (sample_rate 0..1). Yang diprofil adalah
+    pekerjaan di executor (hashing, halaman tanda tangan, merge PDF), hasilnya
+    <directory>/<request_id>/NN_<fungsi>.prof. Paling banyak max_concurrent
+    request diprofil bersamaan; sisanya jalan biasa tanpa profil.
+    """
+
+    def __init__(self, app, directory, token=None, sample_rate=0.0, max_concurrent=2):
+        self.app = app
+        self.directory = directory
+        self.token = token
+        self.sample_rate = sample_rate
+        self.max_concurrent = max_concurrent
+        self.active = 0
+
+    def wants_profile(self, scope):
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    return hmac.compare_digest(value, self.token.encode())
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.wants_profile(scope):
+            return await self.app(scope, receive, send)
+        if self.active >= self.max_concurrent:
+            return await self.app(scope, receive, send)
+
+        request_id = uuid.uuid4().hex[:16]
+        session = ProfileSession(request_id, os.path.join(self.directory, request_id))
+        os.makedirs(session.directory, exist_ok=True)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", request_id.encode())]
+            await send(message)
+
+        self.active += 1
+        token = CURRENT_PROFILE.set(session)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            CURRENT_PROFILE.reset(token)
+            self.active -= 1
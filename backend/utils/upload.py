@@ -0,0 +1,138 @@
+from fastapi import HTTPException
+from python_multipart.multipart import MultipartParser, parse_options_header
+import hashlib, os
+
+
+class UploadedFile:
+    def __init__(self, field, filename, path):
+        self.field = field
+        self.filename = filename
+        self.path = path  # None jika hanya di-hash, tidak disimpan
+        self.size = 0
+        self.digest = None
+        self.hasher = None
+
+
+class StreamingUpload:
+    """Parser multipart yang meng-hash file selagi data diterima.
+
+    Field di hashed_fields di-hash per chunk (dan ditulis ke path dari
+    destination(field, filename) jika destination mengembalikan path).
+    Part lain (mis. .sig.json) dikumpulkan di memori, maksimal
+    max_part_size byte. Dengan begitu file tidak pernah dibaca ulang.
+    """
+
+    def __init__(self, hashed_fields, destination=None, new_hasher=hashlib.sha256,
+                 max_part_size=1024 * 1024):
+        self.hashed_fields = set(hashed_fields)
+        self.destination = destination
+        self.new_hasher = new_hasher
+        self.max_part_size = max_part_size
+        self.files = {}
+        self.fields = {}
+
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name = None
+        self._file = None
+        self._out = None
+        self._hasher = None
+        self._buffer = None
+
+    # --- callback python-multipart ---
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._name = None
+        self._file = None
+        self._out = None
+        self._hasher = None
+        self._buffer = bytearray()
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        self._name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+
+        if filename is not None and self._name in self.hashed_fields:
+            filename = os.path.basename(filename.decode("utf-8", "replace"))
+            path = None
+            if self.destination and filename:
+                path = self.destination(self._name, filename)
+            self._file = UploadedFile(self._name, filename, path)
+            self._hasher = self.new_hasher()
+            if path:
+                self._out = open(path, "wb")
+
+    def on_part_data(self, data, start, end):
+        chunk = memoryview(data)[start:end]
+        if self._file is not None:
+            self._hasher.update(chunk)
+            self._file.size += len(chunk)
+            if self._out is not None:
+                self._out.write(chunk)
+        else:
+            if len(self._buffer) + len(chunk) > self.max_part_size:
+                raise HTTPException(status_code=413, detail="Part terlalu besar")
+            self._buffer += chunk
+
+    def on_part_end(self):
+        if self._file is not None:
+            self._file.digest = self._hasher.digest()
+            self._file.hasher = self._hasher
+            if self._out is not None:
+                self._out.close()
+                self._out = None
+            self.files[self._name] = self._file
+        else:
+            self.fields[self._name] = bytes(self._buffer)
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+
+    # --- parsing ---
+
+    async def parse(self, request, executor=None):
+        content_type = request.headers.get("content-type", "")
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise HTTPException(status_code=400, detail="Request harus multipart/form-data")
+
+        parser = MultipartParser(boundary, {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        })
+
+        try:
+            async for chunk in request.stream():
+                if not chunk:
+                    continue
+                # hash + tulis file di thread pool, event loop tetap bebas
+                if executor is not None:
+                    await executor.run(parser.write, chunk)
+                else:
+                    parser.write(chunk)
+            parser.finalize()
+        finally:
+            self.close()
+        return self
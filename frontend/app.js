@@ -16,8 +16,8 @@ async function verify() {
   const sig = document.getElementById("sig").files[0];
 
   const form = new FormData();
-  form.append("file", doc);
   form.append("signature", sig);
+  form.append("file", doc);
 
   const res = await fetch("http://localhost:8000/verify", {
     method: "POST",